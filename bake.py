@@ -0,0 +1,211 @@
+# bake.py
+# Created: Monday, 19th October 2026 11:38:20 am
+# Matthew Riche
+# Last Modified: Monday, 19th October 2026 11:38:27 am
+# Modified By: Matthew Riche
+
+'''
+FK/IK match-and-bake for built Limb modules, over whole frame ranges.
+
+The world matrices a match needs are sampled for every frame in one pass.  The matching FK
+rotations or IK control and pole-vector positions are then worked out for all frames at once
+with NumPy.  The keys are written straight onto the anim curves in bulk, one API call per channel.
+
+Keys written this way skip Maya's undo queue; undo_bake() takes back the last bake.
+'''
+
+import math
+import numpy as np
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+from . import evaluate as ev
+
+
+_last_bake = [] # (MAnimCurveChange, created curve or None) pairs from the most recent bake.
+
+
+def sample_matrices(attrs, start, end):
+    '''
+    Sample matrix attributes (e.g. 'L_arm_shoulder.worldMatrix[0]') on every frame from start to
+    end, in one pass: the scene is evaluated once per frame and every plug is read under it.
+    Returns frames (F,) and matrices (F, len(attrs), 4, 4).
+    '''
+
+    selection = om.MSelectionList()
+    for attr in attrs:
+        selection.add(attr)
+    plugs = [selection.getPlug(i) for i in range(len(attrs))]
+
+    frames = np.arange(int(start), int(end) + 1)
+    matrices = np.empty((len(frames), len(attrs), 4, 4))
+
+    for f, frame in enumerate(frames):
+        context = om.MDGContext(om.MTime(float(frame), om.MTime.uiUnit()))
+        previous = context.makeCurrent()
+        try:
+            for a, plug in enumerate(plugs):
+                matrix = om.MFnMatrixData(plug.asMObject()).matrix()
+                matrices[f, a] = np.reshape(list(matrix), (4, 4))
+        finally:
+            previous.makeCurrent()
+
+    return frames, matrices
+
+
+def write_keys(attr, frames, values):
+    '''
+    Key one channel on every frame in a single call.  Values are in internal units: radians for
+    angles and centimetres for distances.  Keys already on the curve outside these frames stay.
+    '''
+
+    selection = om.MSelectionList()
+    selection.add(attr)
+    plug = selection.getPlug(0)
+
+    change = oma.MAnimCurveChange()
+    curve_fn = oma.MFnAnimCurve()
+    created = None
+
+    existing = cmds.listConnections(attr, s=True, d=False, type='animCurve') or []
+    if(existing):
+        selection.add(existing[0])
+        curve_fn.setObject(selection.getDependNode(1))
+    else:
+        curve_fn.create(plug)
+        created = curve_fn.name()
+
+    times = om.MTimeArray([om.MTime(float(frame), om.MTime.uiUnit()) for frame in frames])
+    curve_fn.addKeys(times, [float(value) for value in values],
+        oma.MFnAnimCurve.kTangentAuto, oma.MFnAnimCurve.kTangentAuto, True, change)
+
+    _last_bake.append((change, created))
+
+    return
+
+
+def undo_bake():
+    '''
+    Take back every key written by the most recent match/bake.
+    '''
+
+    while(_last_bake):
+        change, created = _last_bake.pop()
+        change.undoIt()
+        if(created is not None and cmds.objExists(created)):
+            cmds.delete(created)
+
+    return
+
+
+def _joint_orient_matrices(joints):
+    '''
+    Rest local matrices (jointOrient then translate) of joints that rest with zero rotation.
+    '''
+
+    to_degrees = (math.degrees(1.0) if cmds.currentUnit(q=True, angle=True) == 'rad' else 1.0)
+    rest = []
+
+    for joint in joints:
+        local = np.reshape(cmds.getAttr(str(joint) + '.matrix'), (4, 4))
+        orient = ev.euler_to_matrix(np.array(cmds.getAttr(str(joint) + '.jointOrient')[0]) *
+            to_degrees)
+        matrix = np.eye(4)
+        matrix[:3, :3] = orient
+        matrix[3, :3] = local[3, :3]
+        rest.append(matrix)
+
+    return np.stack(rest)
+
+
+def _begin_bake():
+    del _last_bake[:]
+
+    return
+
+
+def match_fk_to_ik(limb, start, end=None, switch=True):
+    '''
+    Key the FK controls of a built Limb to follow its IK chain on every frame from start to end.
+    With switch=True, the FKIK attribute is keyed to FK over the same range.
+    '''
+
+    if(end is None):
+        end = start
+
+    _begin_bake()
+
+    attrs = [str(joint) + '.worldMatrix[0]' for joint in limb.ik_joints]
+    attrs.append(str(limb.fk_joints[0]) + '.parentMatrix[0]')
+    frames, sampled = sample_matrices(attrs, start, end)
+
+    ik_world = sampled[:, :3]
+    parents = np.stack([sampled[:, 3], ik_world[:, 0], ik_world[:, 1]], axis=1)
+
+    # Each FK joint's local is its rotate before its rest local, so the rotate is whatever turns
+    # the rest local into the local the IK pose asks for.
+    wanted_local = ik_world @ np.linalg.inv(parents)
+    spin = wanted_local @ np.linalg.inv(_joint_orient_matrices(limb.fk_joints))[None]
+    spin = spin[..., :3, :3] / np.linalg.norm(spin[..., :3, :3], axis=-1, keepdims=True)
+    rotations = np.radians(ev.unroll_euler(ev.matrix_to_euler(spin), axis=0))
+
+    controls = [limb.plan[entry]['control_node'] for entry in ('base', 'hinge', 'end')]
+    for joint_index, control in enumerate(controls):
+        for axis_index, axis in enumerate('XYZ'):
+            write_keys(str(control) + '.rotate' + axis, frames,
+                rotations[:, joint_index, axis_index])
+
+    if(switch):
+        write_keys(str(limb.FKIK_ctrl_node) + '.FKIK', frames,
+            np.full(len(frames), float(limb.switch_size)))
+
+    print("Matched {} FK to IK over {} frames.".format(limb.name, len(frames)))
+
+    return frames
+
+
+def match_ik_to_fk(limb, start, end=None, switch=True):
+    '''
+    Key the IK control and pole vector of a built Limb to follow its FK chain on every frame
+    from start to end.  The pole vector is projected the same way the build places it.
+    With switch=True, the FKIK attribute is keyed to IK over the same range.
+    '''
+
+    if(end is None):
+        end = start
+
+    _begin_bake()
+
+    attrs = [str(joint) + '.worldMatrix[0]' for joint in limb.fk_joints]
+    for control in (limb.IK_end_ctrl, limb.pv_ctrl_node):
+        attrs += [str(control) + '.offsetParentMatrix', str(control) + '.parentMatrix[0]']
+    attrs.append(str(limb.pv_ctrl_node) + '.worldMatrix[0]')
+    frames, sampled = sample_matrices(attrs, start, end)
+
+    base, hinge, end_pos = (sampled[:, i, 3, :3] for i in range(3))
+
+    # Same projection as orient.project_pv, for every frame at once.
+    upper = hinge - base
+    fore = hinge - end_pos
+    bend = (upper / np.linalg.norm(upper, axis=-1, keepdims=True) +
+        fore / np.linalg.norm(fore, axis=-1, keepdims=True))
+    pole = hinge + bend * limb.pv_distance
+    # A straight limb has no bend to project from; the pole stays where it was.
+    straight = (np.linalg.norm(bend, axis=-1) < 1e-6)
+    pole[straight] = sampled[straight, 7, 3, :3]
+
+    # Each control's translate lives in the space of its offset parent matrix and parent.
+    for control, target, first in ((limb.IK_end_ctrl, end_pos, 3), (limb.pv_ctrl_node, pole, 5)):
+        space = sampled[:, first] @ sampled[:, first + 1]
+        point = np.concatenate([target, np.ones((len(frames), 1))], axis=-1)
+        local = np.einsum('fi,fij->fj', point, np.linalg.inv(space))[:, :3]
+        for axis_index, axis in enumerate('XYZ'):
+            write_keys(str(control) + '.translate' + axis, frames, local[:, axis_index])
+
+    if(switch):
+        write_keys(str(limb.FKIK_ctrl_node) + '.FKIK', frames, np.zeros(len(frames)))
+
+    print("Matched {} IK to FK over {} frames.".format(limb.name, len(frames)))
+
+    return frames
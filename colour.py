@@ -8,7 +8,7 @@
 Utils for changing the colour of things in viewport.
 '''
 
-import pymel.core as pm
+import maya.cmds as cmds
 
 colour_enum = { 'grey':0, 'black':1, 'dark_grey':2, 'light_grey':3, 'dark_red':4, 'navy':5, 'blue':6, 
     'dark_green':7, 'dark_purple':8, 'purple':9, 'brown':10, 'dark_brown':11, 'dark_orange':12, 
@@ -18,13 +18,39 @@ colour_enum = { 'grey':0, 'black':1, 'dark_grey':2, 'light_grey':3, 'dark_red':4
     'pale_purple':30, 'violet':31 }
 
 
+def set_override(nodes, colour):
+    '''
+    Set the drawing override colour of many nodes (by name) in one pass.  colour is a name from
+    colour_enum, an index, or an (r, g, b) tuple of floats from 0 to 1.
+    '''
+
+    rgb = isinstance(colour, (list, tuple))
+    if(not rgb and not isinstance(colour, int)):
+        colour = colour_enum[colour]
+
+    for node in nodes:
+        cmds.setAttr(node + '.overrideEnabled', True)
+        cmds.setAttr(node + '.overrideRGBColors', rgb)
+        if(rgb):
+            cmds.setAttr(node + '.overrideColorRGB', *colour)
+        else:
+            cmds.setAttr(node + '.overrideColor', colour)
+
+    return
+
+
 def change_colour(node, colour='red', shape=True ):
     '''
-    Given a node, and a string entry for the colour_enum dict, change the drawing override colour.
-    If shape=True, the shape node will receive colour override in addition to the trans-node.
+    Given a node, and a string entry for the colour_enum dict (or an index, or an RGB tuple), 
+    change the drawing override colour.
+    If shape=True, every shape node under it receives the colour override, else the trans-node does.
     '''
 
-    node.getShape().overrideEnabled.set(True)
-    node.getShape().overrideColor.set(colour_enum[colour])
+    if(shape):
+        targets = cmds.listRelatives(str(node), shapes=True, fullPath=True) or []
+    else:
+        targets = [cmds.ls(str(node), long=True)[0]]
+
+    set_override(targets, colour)
 
-    return
\ No newline at end of file
+    return
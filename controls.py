@@ -5,12 +5,18 @@
 # Modified By: Matthew Riche
 
 import pymel.core as pm
+import maya.api.OpenMaya as om
 import os
 
 from . import colour as cl
 from . import file_ops as fo
 
 
+# The LOD level used when create_control isn't given one.  0 is the full-detail shape; set higher
+# for a whole rig with set_default_lod().
+default_lod = 0
+
+
 def connect_trans(controller, target):
     '''
     Connect 1:1 the translate of a controller to a node.
@@ -31,11 +37,36 @@ def connect_rot(controller, target):
     return
 
 
+def set_default_lod(level=0):
+    '''
+    Pick the shape LOD level every following create_control() call uses unless told otherwise.
+    '''
+
+    global default_lod
+    default_lod = level
+
+    return
+
+
+def pick_lod(shape_dict, lod=0):
+    '''
+    Return the shape data for a LOD level.  Level 0 is the original; asking for a level past the
+    coarsest stored one (see shape_lod.py) gives the coarsest.
+    '''
+
+    if(lod is None or lod <= 0 or len(shape_dict.get('lods', [])) == 0):
+        return shape_dict
+
+    return shape_dict['lods'][min(lod, len(shape_dict['lods'])) - 1]
+
+
 def create_control (target_position=None, shape_dict=None, rot=(0, 0, 0), name='Unnamed_Ctrl', 
-    colour='yellow', size=1, load_shape=None):
+    colour='yellow', size=1, load_shape=None, lod=None):
     '''
     Created a nurbs curve shape from a dict that contains it's knots, points, degree, and all 
-    relevant attributes.
+    relevant attributes.  A dict with a 'shapes' list (see harvest_curves) makes one transform 
+    holding every shape.
+    lod picks a simplified level of the shape; None falls back on default_lod.
     '''    
 
     if(shape_dict == None):
@@ -47,14 +78,25 @@ def create_control (target_position=None, shape_dict=None, rot=(0, 0, 0), name='
                     )
             except:
                 pm.error("Cannot load shape .JSON.  Path may be wrong.")
-            
-
-    new_handle = pm.curve(
-        per=shape_dict['per'], 
-        p=shape_dict['points'], 
-        k=shape_dict['knots'],
-        d=shape_dict['degree']
-        )
+
+    level = (default_lod if lod is None else lod)
+    new_handle = None
+
+    for shape in shape_dict.get('shapes', [shape_dict]):
+        shape = pick_lod(shape, level)
+        new_curve = pm.curve(
+            per=shape['per'], 
+            p=shape['points'], 
+            k=shape['knots'],
+            d=shape['degree']
+            )
+
+        # Every shape after the first moves under the first transform.
+        if(new_handle is None):
+            new_handle = new_curve
+        else:
+            pm.parent(new_curve.getShape(), new_handle, s=True, r=True)
+            pm.delete(new_curve)
 	
     cl.change_colour(new_handle, colour=colour)
 
@@ -82,41 +124,95 @@ def learn_curve(target_curve=None):
     if(target_curve is None):
         target_curve = pm.ls(sl=True)[0]
 
+    return read_curve_shapes([target_curve.getShape()], space='world')[0]
 
-    # Can't pull knots from the curve node itself, gotta hook one of these up;
-    curve_inf = pm.createNode('curveInfo')
-    pm.connectAttr(target_curve.getShape().worldSpace, curve_inf.inputCurve)
 
-    # Record the points from a curve.
-    points = []
-    for i in range(0, curve_inf.controlPoints.getNumElements()):
-        points.append(
-            (curve_inf.controlPoints[i].get()[0],
-            curve_inf.controlPoints[i].get()[1],
-            curve_inf.controlPoints[i].get()[2],)  
-        )
+def read_curve_shapes(shapes, space='world'):
+    '''
+    Read points, knots, degree and form from many nurbsCurve shapes at once.
+    Each curve is read with a single API call per attribute rather than an attribute get per CV.
+    space is 'world' or 'object'.
+    '''
 
-    knots = pm.getAttr(curve_inf.knots)
-    print("knots is {}".format(knots))
+    api_space = (om.MSpace.kWorld if space == 'world' else om.MSpace.kObject)
 
-    degree = target_curve.degree()
+    selection = om.MSelectionList()
+    for shape in shapes:
+        selection.add(str(shape))
 
-    curve_dict = {}
-    curve_dict['points'] = points
-    curve_dict['knots'] = knots
-    curve_dict['degree'] = degree
+    curve_dicts = []
 
-    # TODO this may not be evaluating correctly.  Need to dig into the enum value.
-    if(target_curve.form() == 'periodic'):
-        curve_dict['per'] = True
+    for i in range(selection.length()):
+        curve_fn = om.MFnNurbsCurve(selection.getDagPath(i))
 
-    else:
-        curve_dict['per'] = False
+        curve_dicts.append({
+            'points':[(p.x, p.y, p.z) for p in curve_fn.cvPositions(api_space)],
+            'knots':list(curve_fn.knots()),
+            'degree':curve_fn.degree,
+            'per':(curve_fn.form == om.MFnNurbsCurve.kPeriodic)
+        })
 
-    # Delete the temporary node we used.
-    pm.delete(curve_inf)
+    return curve_dicts
+
+
+def harvest_curves(targets=None, hierarchy=True, space='object', write=True, overwrite=False):
+    '''
+    Read every curve control under targets (the selection if None) into the shape library.
+    Controls with several curve shapes are stored as one multi-shape entry.  With hierarchy=True,
+    every curve transform below the targets is harvested too.
+
+    Each control is saved as control_shapes/<name>.json.  Existing files are skipped unless
+    overwrite=True.  Returns {name: shape dict}.
+    '''
 
-    return curve_dict
+    if(targets is None):
+        targets = pm.ls(sl=True)
+
+    # Gather every transform that owns curve shapes, keeping the first-found order.
+    transforms = []
+    seen = set()
+    for target in pm.ls(targets, type='transform'):
+        candidates = [target]
+        if(hierarchy):
+            candidates += pm.listRelatives(target, ad=True, type='transform')
+        for candidate in candidates:
+            if(candidate.longName() not in seen):
+                seen.add(candidate.longName())
+                transforms.append(candidate)
+
+    owners = []
+    all_shapes = []
+    for transform in transforms:
+        shapes = pm.listRelatives(transform, s=True, ni=True, type='nurbsCurve')
+        if(len(shapes) > 0):
+            owners.append((transform, len(shapes)))
+            all_shapes += shapes
+
+    # One read across the whole batch, then split back out per control.
+    curve_dicts = read_curve_shapes(all_shapes, space=space)
+
+    shape_dir = fo.get_path() + '/control_shapes/'
+    harvested = {}
+    index = 0
+
+    for transform, count in owners:
+        curves = curve_dicts[index:index + count]
+        index += count
+
+        name = transform.nodeName().split(':')[-1]
+        shape_dict = (curves[0] if count == 1 else {'shapes':curves})
+        harvested[name] = shape_dict
+
+        if(write):
+            path = shape_dir + name + '.json'
+            if(os.path.exists(path) and overwrite == False):
+                print("{} is already in the library; skipping.".format(name))
+                continue
+            fo.dump_to_file(shape_dict, path)
+
+    print("Harvested {} controls ({} curves).".format(len(harvested), len(all_shapes)))
+
+    return harvested
 
 
 def list_controls():
@@ -6,63 +6,115 @@
 
 
 from . rmodule import *
+from . plans import PlanTemplate, PlanLayer
+from . import splines as spl
+from . import controls as ctl
+from . import evaluate as ev
 
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
 import pymel.core as pm
 import pymel.core.datatypes as dt
+import numpy as np
 
 class Curve(RMod):
-    def __init__(self, name="C_Generic_RModule", dir_prefix='', mirror=True):
+    meta_handles = ('curve_node', 'base_joint', 'joints')
+
+    # Joints in a spline chain when build_spline() isn't given a count.  Kept apart from the
+    # placer count, so adding placers only refines the curve.
+    joint_count = 10
+
+    PLAN = PlanTemplate({
+        'start':{
+            'pos':(0.0, 3.0, 0.0), 
+            'name':'curve_base',
+            'placer':(1.0, 'blue'),
+        },
+        'mid':{
+            'pos':(0.0, 6.0, 0.0),
+            'name':'curve_mid', 
+            'placer':(1.0, 'blue'),
+        },
+        'end':{
+            'pos':(0.0, 9.0, 0.0),
+            'name':'curve_end', 
+            'placer':(1.0, 'blue'),
+        }
+    })
+
+    def __init__(self, name="C_Generic_RModule", dir_prefix='', mirror=True, placer_count=None):
         '''
         A curve defining class.
+        placer_count spreads that many placers from the plan's start to its end, in place of the
+        default three.
         '''
         super().__init__(name=name, dir_prefix=dir_prefix, mirror=mirror)
 
-        self.curve_node = None
+        if(placer_count is not None):
+            self.plan = PlanLayer(self.spread_plan(placer_count))
 
-        self.plan = {
-            'start':{
-                'pos':(0.0, 3.0, 0.0), 
-                'name':'curve_base',
-                'placer':(1.0, 'blue'),
-            },
-            'mid':{
-                'pos':(0.0, 6.0, 0.0),
-                'name':'curve_mid', 
-                'placer':(1.0, 'blue'),
-            },
-            'end':{
-                'pos':(0.0, 9.0, 0.0),
-                'name':'curve_end', 
-                'placer':(1.0, 'blue'),
-            }
-        }
+        self.curve_node = None
 
         return
 
-    def build_curve(self):
+    @classmethod
+    def spread_plan(cls, count):
+        '''
+        A plan of count placers evenly spaced between the start and end of cls.PLAN.
+        '''
+
+        count = max(int(count), 2)
+        start = dt.Vector(cls.PLAN['start']['pos'])
+        end = dt.Vector(cls.PLAN['end']['pos'])
+
+        entries = {}
+        for i in range(count):
+            if(i == 0):
+                key = 'start'
+            elif(i == count - 1):
+                key = 'end'
+            else:
+                key = 'mid' + str(i).zfill(2)
+
+            if(key in cls.PLAN):
+                entries[key] = dict(cls.PLAN[key])
+            else:
+                entries[key] = {'name':('curve_' + str(i).zfill(2)),
+                    'placer':cls.PLAN['start']['placer']}
+
+            entries[key]['pos'] = tuple(start + (end - start) * (float(i) / (count - 1)))
+
+        return PlanTemplate(entries)
+
+    def build_curve(self, degree=3, parameterization='chord'):
         ''' 
-        Given placers, construct a curve defined by them.
+        Given placers, construct a curve passing through them.
+        The curve stays at degree (cubic by default) however many placers there are, and is
+        parameterized by 'chord' length, 'centripetal' or 'uniform' spacing.
         '''
 
-        point_list = []
+        point_list = [self.plan[entry]['placer_node'].getTranslation(space='world') 
+            for entry in self.plan]
 
-        for entry in self.plan:
-            point_list.append(
-                dt.Vector(self.plan[entry]['placer_node'].getTranslation(space='world'))
-                )
-            
-        print("The point list xforms {}".format(point_list))
-        degree = (len(point_list) - 1)
+        print("Fitting a curve through {} placers.".format(len(point_list)))
+        fitted = spl.interpolate(point_list, degree=degree, parameterization=parameterization)
 
-        new_curve = pm.curve(per=False, p=point_list, d=degree)
+        new_curve = pm.curve(per=False, p=fitted['points'].tolist(), 
+            k=[float(k) for k in fitted['knots']], d=fitted['degree'])
 
         self.curve_node = new_curve
 
-    def build_spline(self, rebuild=False, count=5):
+        return new_curve
+
+    def build_spline(self, rebuild=False, count=5, joint_count=None, up=(0.0, 0.0, 1.0)):
         '''
-        Makes the self.curve into a spline_IK with joints
+        Makes the self.curve into a spline_IK with joints, oriented along the curve from up.
+        joint_count joints are spread evenly along it; None uses self.joint_count.
         '''
 
+        if(joint_count is None):
+            joint_count = self.joint_count
+
         pm.select(cl=True)
 
         if(rebuild):
@@ -75,7 +127,7 @@ class Curve(RMod):
             self.curve_node.rename(old_curve_name)
 
         
-        joint_array = make_joint_array(self.curve_node)
+        joint_array = make_joint_array(self.curve_node, count=joint_count, up=up)
 
         self.joints = joint_array['all']
         self.base_joint = joint_array['base']
@@ -88,26 +140,54 @@ class Curve(RMod):
         return
         
 
-def make_joint_array(target_curve, name="spline"):
+def make_joint_array(target_curve, name="spline", count=None, up=(0.0, 0.0, 1.0), aim_axis=0, 
+    up_axis=2):
     '''
-    Make a joint for every CV on a high-res curve.
+    Make a chain of count joints spaced evenly along a curve, by arc length.
+    Without a count, a joint is made for every CV, as suits a high-res curve.
+
+    The chain is oriented with rotation-minimizing frames (see splines.py), starting from up, so
+    it doesn't twist along the curve.  Every orientation is worked out in one go beforehand, so
+    making the chain is only a createNode and two setAttrs per joint, all of them undoable.
     ''' 
 
-    joints_built = []
-    base_joint = None
+    # Curve data straight from the API, in internal units.
+    shape = ctl.read_curve_shapes([target_curve.getShape()], 'world')[0]
+    if(count is None):
+        positions = np.asarray(shape['points'], dtype=float)
+    else:
+        positions = spl.sample_by_length(shape, count)
+
+    world = spl.rotation_minimizing_frames(positions, up=up, aim_axis=aim_axis, up_axis=up_axis)
+
+    # Each joint's local is its world matrix in its parent's space; the first is in world space.
+    parents = np.concatenate([np.eye(4)[None], world[:-1]])
+    local = world @ np.linalg.inv(parents)
+    orients = ev.matrix_to_euler(local[:, :3, :3])
+
+    # setAttr takes UI units; the curve was read in internal ones.
+    translates = local[:, 3, :3] * om.MDistance(1.0).asUnits(om.MDistance.uiUnit())
+    if(om.MAngle.uiUnit() == om.MAngle.kRadians):
+        orients = np.radians(orients)
+
+    joint_names = []
+    parent = None
+
+    for i in range(len(world)):
+        joint_name = name + str(i + 1).zfill(2) + '_joint'
+        if(parent is None):
+            parent = cmds.createNode('joint', n=joint_name)
+        else:
+            parent = cmds.createNode('joint', n=joint_name, p=parent)
+        parent = cmds.ls(parent, long=True)[0]
 
-    pm.select(cl=True)
+        cmds.setAttr(parent + '.translate', *translates[i].tolist())
+        cmds.setAttr(parent + '.jointOrient', *orients[i].tolist())
+        joint_names.append(parent)
 
-    count = 0
-    for point in target_curve.cv:
-        count += 1
-        tip_joint = pm.joint(
-            p=(pm.pointPosition(point)), name=(name + str(count).zfill(2) + '_joint'))
-        joints_built.append(tip_joint)
-        if(base_joint is None):
-            base_joint = tip_joint
+    joints_built = pm.ls(joint_names)
 
-    return {'base':base_joint, 'all':joints_built}
+    return {'base':joints_built[0], 'all':joints_built}
 
 
 def rebuild_curve(target_curve, new_curve_name='new_curve', cv_count=5):
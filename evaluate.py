@@ -0,0 +1,314 @@
+# evaluate.py
+# Created: Monday, 19th October 2026 9:14:03 am
+# Matthew Riche
+# Last Modified: Monday, 19th October 2026 9:14:10 am
+# Modified By: Matthew Riche
+
+'''
+A headless evaluator for Limb rigs, in NumPy alone (no Maya), for rig QA on the farm.
+
+Given a limb's rest world matrices (see Limb.rest_matrices()), it poses the bind chain for whole
+frame ranges at once: the FK chain from per-frame rotations, the IK chain with an analytic
+two-bone rotate-plane solve, and the two blended by the FKIK switch the way Limb wires it.
+
+Matrices follow Maya's convention: 4x4, row vectors, translation in the bottom row, and
+world = local @ parent_world.  Rotations are in degrees, rotate order xyz.
+'''
+
+import numpy as np
+
+
+def euler_to_matrix(angles):
+    '''
+    (..., 3) xyz euler angles in degrees to (..., 3, 3) rotation matrices.
+    '''
+
+    x, y, z = np.moveaxis(np.radians(np.asarray(angles, dtype=float)), -1, 0)
+    cx, sx, cy, sy, cz, sz = np.cos(x), np.sin(x), np.cos(y), np.sin(y), np.cos(z), np.sin(z)
+
+    # Rx @ Ry @ Rz, written out.
+    return np.stack([
+        np.stack([cy * cz, cy * sz, -sy], axis=-1),
+        np.stack([sx * sy * cz - cx * sz, sx * sy * sz + cx * cz, sx * cy], axis=-1),
+        np.stack([cx * sy * cz + sx * sz, cx * sy * sz - sx * cz, cx * cy], axis=-1)
+    ], axis=-2)
+
+
+def matrix_to_euler(matrices):
+    '''
+    (..., 3, 3) rotation matrices to (..., 3) xyz euler angles in degrees.
+    '''
+
+    m = np.asarray(matrices, dtype=float)
+    y = np.arcsin(np.clip(-m[..., 0, 2], -1.0, 1.0))
+    cy = np.cos(y)
+    locked = (np.abs(cy) < 1e-6)
+
+    x = np.arctan2(m[..., 1, 2], m[..., 2, 2])
+    z = np.arctan2(m[..., 0, 1], m[..., 0, 0])
+
+    # Gimbal lock: z is folded into x.
+    sy = np.sign(-m[..., 0, 2])
+    x = np.where(locked, np.arctan2(m[..., 1, 0] * sy, m[..., 1, 1]), x)
+    z = np.where(locked, 0.0, z)
+
+    return np.degrees(np.stack([x, y, z], axis=-1))
+
+
+def unroll_euler(angles, axis=0):
+    '''
+    Remove 360 degree jumps between neighbouring frames, like a simple euler filter.
+    '''
+
+    return np.degrees(np.unwrap(np.radians(angles), axis=axis))
+
+
+def _normalize(vectors):
+    lengths = np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+    return vectors / np.where(lengths == 0.0, 1.0, lengths)
+
+
+def _homogeneous(rotations, positions):
+    '''
+    Build (..., 4, 4) matrices from (..., 3, 3) rotations and (..., 3) positions.
+    '''
+
+    shape = rotations.shape[:-2]
+    matrices = np.zeros(shape + (4, 4))
+    matrices[..., :3, :3] = rotations
+    matrices[..., 3, :3] = positions
+    matrices[..., 3, 3] = 1.0
+
+    return matrices
+
+
+def _rest_locals(rest_world):
+    '''
+    Local rest matrices of a base, hinge, end chain; the base's parent is the world.
+    '''
+
+    rest_world = np.asarray(rest_world, dtype=float).reshape(3, 4, 4)
+
+    return np.stack([
+        rest_world[0],
+        rest_world[1] @ np.linalg.inv(rest_world[0]),
+        rest_world[2] @ np.linalg.inv(rest_world[1])
+    ])
+
+
+def fk_pose(rest_world, rotations):
+    '''
+    World matrices of the FK chain, (F, 3, 4, 4), from (F, 3, 3) per-joint rotate values.
+    The FK joints rest with zero rotation, so each joint's local is its rotate before its rest
+    local (jointOrient and translate).
+    '''
+
+    locals_ = _rest_locals(rest_world)
+    rotations = np.asarray(rotations, dtype=float).reshape(-1, 3, 3)
+
+    spin = np.zeros(rotations.shape[:2] + (4, 4))
+    spin[..., :3, :3] = euler_to_matrix(rotations)
+    spin[..., 3, 3] = 1.0
+
+    base = spin[:, 0] @ locals_[0]
+    hinge = spin[:, 1] @ locals_[1] @ base
+    end = spin[:, 2] @ locals_[2] @ hinge
+
+    return np.stack([base, hinge, end], axis=1)
+
+
+def _plane_frame(aim, target_dir, pole_dir):
+    '''
+    Rows: the aim direction, the rotate-plane normal, and their cross product.
+    '''
+
+    pole_perp = _normalize(pole_dir - (np.sum(pole_dir * target_dir, axis=-1, keepdims=True) *
+        target_dir))
+    normal = _normalize(np.cross(target_dir, pole_perp))
+
+    return np.stack([aim, normal, np.cross(aim, normal)], axis=-2)
+
+
+def ik_pose(rest_world, targets, poles, base_positions=None, rest_pole=None):
+    '''
+    World matrices of the IK chain, (F, 3, 4, 4), for (F, 3) IK control and pole-vector
+    positions, using an analytic two-bone rotate-plane solve without stretch.
+
+    base_positions is the (F, 3) position of the chain's base, if it moves.  rest_pole is where
+    the pole vector sat at rest; it only matters when the rest chain is perfectly straight.
+    '''
+
+    rest_world = np.asarray(rest_world, dtype=float).reshape(3, 4, 4)
+    targets = np.asarray(targets, dtype=float).reshape(-1, 3)
+    poles = np.asarray(poles, dtype=float).reshape(-1, 3)
+    frames = len(targets)
+
+    rest_base, rest_hinge, rest_end = rest_world[:, 3, :3]
+    upper = np.linalg.norm(rest_hinge - rest_base)
+    lower = np.linalg.norm(rest_end - rest_hinge)
+
+    if(base_positions is None):
+        base = np.broadcast_to(rest_base, (frames, 3))
+    else:
+        base = np.asarray(base_positions, dtype=float).reshape(-1, 3)
+
+    # Reach, clamped to what the two bones can actually span.
+    to_target = targets - base
+    distance = np.clip(np.linalg.norm(to_target, axis=-1), abs(upper - lower) + 1e-9,
+        upper + lower)
+    target_dir = _normalize(to_target)
+    pole_dir = poles - base
+    pole_perp = _normalize(pole_dir - np.sum(pole_dir * target_dir, axis=-1, keepdims=True) *
+        target_dir)
+
+    cos_base = np.clip((upper ** 2 + distance ** 2 - lower ** 2) / (2.0 * upper * distance),
+        -1.0, 1.0)
+    sin_base = np.sqrt(1.0 - cos_base ** 2)
+
+    hinge = base + upper * (cos_base[:, None] * target_dir + sin_base[:, None] * pole_perp)
+    end = base + distance[:, None] * target_dir
+
+    # The rest pose's own rotate plane.  A bent rest chain defines it; a straight one needs the pole.
+    rest_target_dir = _normalize(rest_end - rest_base)
+    rest_pole_dir = (rest_hinge - rest_base) - (np.dot(rest_hinge - rest_base, rest_target_dir) *
+        rest_target_dir)
+    if(np.linalg.norm(rest_pole_dir) < 1e-6 * upper):
+        if(rest_pole is None):
+            raise ValueError("The rest chain is straight; a rest_pole is needed to define its plane.")
+        rest_pole_dir = np.asarray(rest_pole, dtype=float) - rest_base
+
+    rest_frames = [
+        _plane_frame(_normalize(rest_hinge - rest_base), rest_target_dir, rest_pole_dir),
+        _plane_frame(_normalize(rest_end - rest_hinge), rest_target_dir, rest_pole_dir)
+    ]
+    pose_frames = [
+        _plane_frame(_normalize(hinge - base), target_dir, pole_dir),
+        _plane_frame(_normalize(end - hinge), target_dir, pole_dir)
+    ]
+
+    # Each joint keeps its rest orientation relative to its bone and the rotate plane.
+    world = []
+    for joint, position in zip(range(2), (base, hinge)):
+        delta = np.swapaxes(rest_frames[joint], -1, -2) @ pose_frames[joint]
+        world.append(_homogeneous(rest_world[joint, :3, :3] @ delta, position))
+
+    # The end joint isn't solved; it rides on the hinge.
+    world.append(_rest_locals(rest_world)[2] @ world[1])
+
+    return np.stack(world, axis=1)
+
+
+def _to_quaternion(rotations):
+    '''
+    (..., 3, 3) proper rotation matrices to (..., 4) quaternions, w last.
+    '''
+
+    m = rotations
+    w = np.sqrt(np.maximum(0.0, 1.0 + m[..., 0, 0] + m[..., 1, 1] + m[..., 2, 2])) / 2.0
+    x = np.sqrt(np.maximum(0.0, 1.0 + m[..., 0, 0] - m[..., 1, 1] - m[..., 2, 2])) / 2.0
+    y = np.sqrt(np.maximum(0.0, 1.0 - m[..., 0, 0] + m[..., 1, 1] - m[..., 2, 2])) / 2.0
+    z = np.sqrt(np.maximum(0.0, 1.0 - m[..., 0, 0] - m[..., 1, 1] + m[..., 2, 2])) / 2.0
+
+    # Row-vector matrices are the transpose of the column-vector ones the signs come from.
+    x = np.copysign(x, m[..., 1, 2] - m[..., 2, 1])
+    y = np.copysign(y, m[..., 2, 0] - m[..., 0, 2])
+    z = np.copysign(z, m[..., 0, 1] - m[..., 1, 0])
+
+    return np.stack([x, y, z, w], axis=-1)
+
+
+def _from_quaternion(quats):
+    x, y, z, w = np.moveaxis(quats, -1, 0)
+
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y + z * w), 2 * (x * z - y * w)], axis=-1),
+        np.stack([2 * (x * y - z * w), 1 - 2 * (x * x + z * z), 2 * (y * z + x * w)], axis=-1),
+        np.stack([2 * (x * z + y * w), 2 * (y * z - x * w), 1 - 2 * (x * x + y * y)], axis=-1)
+    ], axis=-2)
+
+
+def blend_poses(fk_world, ik_world, switch, float_size=100.0):
+    '''
+    Blend FK and IK world matrices the way Limb's parent constraints do.  The switch runs from 0
+    (IK) to float_size (FK).  Positions blend linearly, rotations by normalized quaternion.
+    '''
+
+    fk_weight = np.clip(np.asarray(switch, dtype=float).reshape(-1) / float_size, 0.0, 1.0)
+    fk_weight = fk_weight[:, None]
+
+    # Aim solves can leave mirrored (negative determinant) frames.  Blend the proper rotation and
+    # put the flip back after.
+    fk_rot = fk_world[..., :3, :3]
+    ik_rot = ik_world[..., :3, :3]
+    flip = np.sign(np.linalg.det(fk_rot))[..., None, None]
+    scale = np.linalg.norm(fk_rot, axis=-1, keepdims=True)
+
+    fk_quat = _to_quaternion(fk_rot * flip / scale)
+    ik_quat = _to_quaternion(ik_rot * flip / np.linalg.norm(ik_rot, axis=-1, keepdims=True))
+    ik_quat = ik_quat * np.sign(np.sum(fk_quat * ik_quat, axis=-1, keepdims=True) + 1e-12)
+
+    quat = _normalize(fk_weight[..., None] * fk_quat + (1.0 - fk_weight[..., None]) * ik_quat)
+    rotation = _from_quaternion(quat) * flip * scale
+    position = (fk_weight[..., None] * fk_world[..., 3, :3] +
+        (1.0 - fk_weight[..., None]) * ik_world[..., 3, :3])
+
+    return _homogeneous(rotation, position)
+
+
+def evaluate_limb(rest_world, fk_rotations, ik_targets, poles, switch, float_size=100.0,
+    base_positions=None, rest_pole=None):
+    '''
+    Bind-joint world matrices, (F, 3, 4, 4), for every frame at once.
+    All per-frame inputs share their first axis: fk_rotations (F, 3, 3), ik_targets (F, 3),
+    poles (F, 3) and switch (F,).
+    '''
+
+    fk_world = fk_pose(rest_world, fk_rotations)
+    ik_world = ik_pose(rest_world, ik_targets, poles, base_positions=base_positions,
+        rest_pole=rest_pole)
+
+    return blend_poses(fk_world, ik_world, switch, float_size=float_size)
+
+
+def find_flips(world, threshold=90.0):
+    '''
+    Frames where a joint's world rotation jumps by more than threshold degrees from the frame
+    before.  Returns (frame, joint) index pairs; frame is the later of the two.
+    '''
+
+    rotations = _normalize(world[..., :3, :3])
+    relative = rotations[1:] @ np.swapaxes(rotations[:-1], -1, -2)
+    cosine = np.clip((np.trace(relative, axis1=-2, axis2=-1) - 1.0) / 2.0, -1.0, 1.0)
+    jumps = np.degrees(np.arccos(cosine))
+    frames, joints = np.nonzero(jumps > threshold)
+
+    return np.stack([frames + 1, joints], axis=-1)
+
+
+def reach_ratio(rest_world, ik_targets, base_positions=None):
+    '''
+    Distance to the IK target over the chain's full length, per frame.  Above 1.0 the IK control
+    is out of reach and the limb would have to stretch.
+    '''
+
+    rest_world = np.asarray(rest_world, dtype=float).reshape(3, 4, 4)
+    rest_base, rest_hinge, rest_end = rest_world[:, 3, :3]
+    length = np.linalg.norm(rest_hinge - rest_base) + np.linalg.norm(rest_end - rest_hinge)
+
+    base = (rest_base if base_positions is None else np.asarray(base_positions, dtype=float))
+
+    return np.linalg.norm(np.asarray(ik_targets, dtype=float) - base, axis=-1) / length
+
+
+def bone_stretch(rest_world, world):
+    '''
+    Each bone's posed length over its rest length, (F, 2), for the upper and lower bones.
+    Anything away from 1.0 means the chain is stretching or squashing.
+    '''
+
+    rest_world = np.asarray(rest_world, dtype=float).reshape(3, 4, 4)
+    rest_lengths = np.linalg.norm(np.diff(rest_world[:, 3, :3], axis=0), axis=-1)
+    lengths = np.linalg.norm(np.diff(world[..., 3, :3], axis=1), axis=-1)
+
+    return lengths / rest_lengths
@@ -0,0 +1,106 @@
+# export.py
+# Created: Tuesday, 20th October 2026 10:02:48 am
+# Matthew Riche
+# Last Modified: Tuesday, 20th October 2026 10:02:53 am
+# Modified By: Matthew Riche
+
+'''
+Walks built modules in the scene and writes them out as a rig file (see rigfile.py), so crowd,
+engine and QA tools can read the rig without opening the scene.
+'''
+
+import numpy as np
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+from . import metadata as meta
+from . import rigfile as rf
+
+
+def _module_joints(module):
+    '''
+    Long names of every joint a module built: its plan's joints, the joints among its handles,
+    and everything beneath them.
+    '''
+
+    found = [module.plan[entry]['joint_node'] for entry in module.plan 
+        if(module.plan[entry].get('joint_node') is not None)]
+
+    for attr in module.meta_handles:
+        value = getattr(module, attr, None)
+        for node in (value if isinstance(value, (list, tuple)) else [value]):
+            if(node is not None):
+                found.append(node)
+
+    if(len(found) == 0):
+        return []
+
+    return cmds.ls([str(node) for node in found], dag=True, type='joint', long=True) or []
+
+
+def _world_matrices(paths):
+    '''
+    World matrices, (N, 4, 4), for many DAG paths in one API pass.
+    '''
+
+    selection = om.MSelectionList()
+    for path in paths:
+        selection.add(path)
+
+    world = np.empty((len(paths), 4, 4))
+    for i in range(len(paths)):
+        world[i] = np.reshape(list(selection.getDagPath(i).inclusiveMatrix()), (4, 4))
+
+    return world
+
+
+def export_rig(path, modules=None):
+    '''
+    Write the joints, controls and FKIK switches of built modules to a rig file at path.
+    Without modules, every module recorded on the rig root is exported.  Matrices are taken as
+    the rig stands, so export from the rest pose.  Returns the number of joints written.
+    '''
+
+    if(modules is None):
+        modules = list(meta.load_modules().values())
+
+    joints = []
+    for module in modules:
+        joints += _module_joints(module)
+    joints = list(dict.fromkeys(joints))
+    index = {joint:i for i, joint in enumerate(joints)}
+
+    def _joint_index(node):
+        return index.get(cmds.ls(str(node), long=True)[0], -1)
+
+    parents = [index.get(joint.rsplit('|', 1)[0], -1) for joint in joints]
+
+    world = (_world_matrices(joints) if joints else np.zeros((0, 4, 4)))
+
+    # Locals are relative to the exported parent, so local @ world[parent] gives world back.
+    # Roots, whose DAG parents (controls, groups) aren't in the file, keep their world matrix.
+    parent_world = np.array([world[parent] if(parent >= 0) else np.eye(4) for parent in parents])
+    local = (world @ np.linalg.inv(parent_world) if joints else world)
+
+    controls = []
+    switches = []
+    for module in modules:
+        for control, joint in module.control_joints():
+            controls.append((str(control).split('|')[-1], _joint_index(joint)))
+        for switch in module.switch_wiring():
+            switches.append({
+                'control':str(switch['control']).split('|')[-1],
+                'attr':switch['attr'],
+                'fk':_joint_index(switch['fk']),
+                'ik':_joint_index(switch['ik']),
+                'bind':_joint_index(switch['bind']),
+                'float_size':switch['float_size']
+            })
+
+    names = [joint.split('|')[-1] for joint in joints]
+    size = rf.write_rig(path, names, parents, local, world, controls=controls, switches=switches)
+
+    print("Exported {} joints, {} controls and {} switches to {} ({} bytes).".format(
+        len(joints), len(controls), len(switches), path, size))
+
+    return len(joints)
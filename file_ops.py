@@ -6,7 +6,6 @@
 
 import json
 import os
-import pymel.core as pm
 
 
 def get_path():
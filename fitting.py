@@ -0,0 +1,123 @@
+# fitting.py
+# Created: Monday, 19th October 2026 3:02:11 pm
+# Matthew Riche
+# Last Modified: Monday, 19th October 2026 3:02:16 pm
+# Modified By: Matthew Riche
+
+'''
+Automatic placer fitting from a character mesh.
+
+The mesh's vertices are read once into an array and indexed in a spatial grid (spatial.py).
+Each placer's default position is then pulled onto the mesh: to the centroid of the limb's
+cross-section around it when the plan gives it a bone direction, otherwise to the centroid of the
+nearby surface.  One read and one index serve every module fitted to the same mesh, so a
+template can be batch-placed across a whole cast.
+'''
+
+import numpy as np
+import maya.cmds as cmds
+
+from . spatial import GridIndex
+
+
+def read_mesh_points(mesh):
+    '''
+    World-space positions of every vertex of a mesh, as an (N, 3) array, in one bulk query.
+    '''
+
+    # One flat list of floats for the whole mesh; no Python object per vertex.
+    flat = cmds.xform(str(mesh) + '.vtx[*]', q=True, ws=True, t=True)
+
+    return np.array(flat, dtype=float).reshape(-1, 3)
+
+
+def mesh_index(mesh):
+    '''
+    A GridIndex over a mesh's vertices.
+    '''
+
+    return GridIndex(read_mesh_points(mesh))
+
+
+def fit_positions(index, guesses, directions=None, radius=1.0, slab=None, iterations=3):
+    '''
+    Pull guessed positions onto the indexed points.
+
+    For a guess with a (unit) direction, only points within slab of the plane through the guess,
+    normal to that direction, count: the centroid of that cross-section finds the middle of a limb
+    without sliding along it.  A guess with no direction goes to the centroid of everything within
+    radius.  Each guess is re-centred a few times; guesses with nothing nearby stay put.
+    '''
+
+    guesses = np.asarray(guesses, dtype=float).reshape(-1, 3)
+    if(directions is None):
+        directions = np.zeros_like(guesses)
+    if(slab is None):
+        slab = radius * 0.25
+
+    fitted = guesses.copy()
+
+    for i, (center, direction) in enumerate(zip(guesses, directions)):
+        for iteration in range(iterations):
+            points = index.points[index.query_radius(center, radius)]
+
+            if(np.any(direction)):
+                points = points[np.abs((points - center) @ direction) <= slab]
+            if(len(points) == 0):
+                break
+
+            centroid = points.mean(axis=0)
+            if(np.any(direction)):
+                # Stay on the cross-section plane.
+                centroid -= ((centroid - center) @ direction) * direction
+            center = centroid
+
+        fitted[i] = center
+
+    return fitted
+
+
+def fit_module(module, index, radius=None, slab=None):
+    '''
+    Fitted placer positions for a module, as {entry: (x, y, z)}, ready for build_placers().
+    index is a GridIndex or a mesh.  The default radius is 5% of the mesh's bounding-box diagonal.
+    '''
+
+    if(not isinstance(index, GridIndex)):
+        index = mesh_index(index)
+
+    if(radius is None):
+        radius = 0.05 * float(np.linalg.norm(index.points.max(axis=0) - index.points.min(axis=0)))
+
+    entries = list(module.plan)
+    guesses = np.array([module.default_position(entry) for entry in entries], dtype=float)
+
+    # Bone directions come from the same aim targets build_joints orients by.
+    parents = module.joint_parents()
+    directions = np.zeros_like(guesses)
+    for i, entry in enumerate(entries):
+        target = module.aim_target(entry, parents)
+        if(target is not None):
+            bone = guesses[entries.index(target)] - guesses[i]
+            if(np.linalg.norm(bone) > 0.0):
+                directions[i] = bone / np.linalg.norm(bone)
+
+    fitted = fit_positions(index, guesses, directions=directions, radius=radius, slab=slab)
+
+    return {entry:tuple(float(v) for v in fitted[i]) for i, entry in enumerate(entries)}
+
+
+def build_fitted_placers(modules, mesh, radius=None, slab=None):
+    '''
+    Build the placers of several modules fitted to one mesh, reading and indexing it only once.
+    Returns {module name: fitted positions}.
+    '''
+
+    index = mesh_index(mesh)
+    fitted = {}
+
+    for module in modules:
+        fitted[module.name] = fit_module(module, index, radius=radius, slab=slab)
+        module.build_placers(positions=fitted[module.name])
+
+    return fitted
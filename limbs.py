@@ -5,15 +5,63 @@
 # Modified By: Matthew Riche
 
 from . rmodule import *
-from . placer import mirror_placer
+from . plans import PlanTemplate
 from . import orient as ori
 from . import constraints as cns
 from . import controls as ctl
-from . import colour as col
+from . import style as sty
 
 import pprint
 
 class Limb(RMod):
+    meta_handles = ('base_joint', 'hinge_joint', 'end_joint', 'fk_joints', 'ik_joints', 
+        'ik_handle', 'pv_ctrl_node', 'pv_null', 'FKIK_ctrl_node', 'IK_base_ctrl', 'IK_end_ctrl')
+
+    switch_size = 100 # The FKIK attribute runs 0 (IK) to this (FK).
+    pv_distance = 200 # How far the pole vector is projected out from the hinge.
+
+    # The anatomy of these tuples is:
+    #   [0] World Space Position
+    #   [1] World Space Scale.
+    #   [2] The name in the scene.
+    #   [3] The colour (string that matches our colour dict.)
+    #   [4] The key name.
+    # The key name and the scene name being diffent allows for modules that inherit something 
+    # generic like 'limb' and still reference placers correctly while displaying more accurate
+    # names in the viewport.
+    # The plan is shared by every Limb; instances only store what they change.  See plans.py.
+    PLAN = PlanTemplate({
+        'base':{
+            'pos':(0.0, 3.0, 4.0), 
+            'name':'base',
+            'placer':(1.0, 'orange'),
+            'up_plc':{'pos':(0.0, 0.0, 7.0), 'size':0.4, 'colour':'white' },
+            'aim':1,
+            'up':0,
+            'child':'hinge',
+            'control':['thin_ring', 1.0, 'yellow']
+        },
+        'hinge':{
+            'pos':(0.0, 3.0, -4.0),
+            'name':'hinge', 
+            'placer':(1.0, 'orange'),
+            'up_plc':{'pos':(7.0, 7.0, 7.0), 'size':0.4, 'colour':'white' },
+            'aim':1,
+            'up':0,
+            'child':'end',
+            'control':['thin_ring', 0.7, 'yellow']
+        },
+        'end':{
+            'pos':(0.0, 3.0, -4.0),
+            'name':'hinge', 
+            'placer':(1.0, 'orange'),
+            'up_plc':{'pos':(7.0, 0.0, 0.0), 'size':0.4, 'colour':'white' },
+            'aim':1,
+            'up':0,
+            'control':['thin_ring', 1.0, 'yellow']
+        }
+    })
+
     def __init__(self, name="C_Generic_Limb", dir_prefix='', mirror=True):
         '''
         A generic limb as a base, hinge, and end joint.  For an arm this will be shoulder, elbow,
@@ -21,60 +69,30 @@ class Limb(RMod):
         '''
         super().__init__(name=name, dir_prefix=dir_prefix, mirror=mirror)
 
-        # The anatomy of these tuples is:
-        #   [0] World Space Position
-        #   [1] World Space Scale.
-        #   [2] The name in the scene.
-        #   [3] The colour (string that matches our colour dict.)
-        #   [4] The key name.
-        # The key name and the scene name being diffent allows for modules that inherit something 
-        # generic like 'limb' and still reference placers correctly while displaying more accurate
-        # names in the viewport.
-
-        self.plan = {
-            'base':{
-                'pos':(0.0, 3.0, 4.0), 
-                'name':'base',
-                'placer':(1.0, 'orange'),
-                'up_plc':{'pos':(0.0, 0.0, 7.0), 'size':0.4, 'colour':'white' },
-                'aim':1,
-                'up':0,
-                'child':'hinge',
-                'control':['thin_ring', 1.0, 'yellow']
-            },
-            'hinge':{
-                'pos':(0.0, 3.0, -4.0),
-                'name':'hinge', 
-                'placer':(1.0, 'orange'),
-                'up_plc':{'pos':(7.0, 7.0, 7.0), 'size':0.4, 'colour':'white' },
-                'aim':1,
-                'up':0,
-                'child':'end',
-                'control':['thin_ring', 0.7, 'yellow']
-            },
-            'end':{
-                'pos':(0.0, 3.0, -4.0),
-                'name':'hinge', 
-                'placer':(1.0, 'orange'),
-                'up_plc':{'pos':(7.0, 0.0, 0.0), 'size':0.4, 'colour':'white' },
-                'aim':1,
-                'up':0,
-                'control':['thin_ring', 1.0, 'yellow']
-            }
-        }
-
         # Get membership for the essential joints of a parent joint.
         self.base_joint = None
         self.hinge_joint = None
         self.end_joint = None
 
+        # The FK and IK duplicates of the chain, and the solver driving the IK one.
+        self.fk_joints = []
+        self.ik_joints = []
+        self.ik_handle = None
+
+        # The controls made outside the plan.
+        self.FKIK_ctrl_node = None
+        self.IK_base_ctrl = None
+        self.IK_end_ctrl = None
+        self.pv_ctrl_node = None
+        self.pv_null = None
+
         return
 
-    def build_module(self):
+    def iter_build_module(self):
         '''
         Based upon placers in the scene, begin construction
         '''
-        super().build_module()
+        yield from super().iter_build_module()
 
         # Select clear to disallow any automatic parenting
         pm.select(cl=True)
@@ -83,6 +101,9 @@ class Limb(RMod):
         bind_base = (self.plan['base']['joint_node'])
         bind_hinge = (self.plan['hinge']['joint_node'])
         bind_end = (self.plan['end']['joint_node'])
+        self.base_joint = bind_base
+        self.hinge_joint = bind_hinge
+        self.end_joint = bind_end
 
         # Let's duplicate the joints we made...
         FK_base = pm.duplicate(self.plan['base']['joint_node'], po=False)[0]
@@ -98,63 +119,144 @@ class Limb(RMod):
         IK_base.rename(self.side_prefix + "IK" + self.plan['base']['name'] + "_joint")
         IK_hinge.rename(self.side_prefix + "IK" + self.plan['hinge']['name'] + "_joint")
         IK_end.rename(self.side_prefix + "IK" + self.plan['end']['name'] + "_joint")
+        self.fk_joints = [FK_base, FK_hinge, FK_end]
+        self.ik_joints = [IK_base, IK_hinge, IK_end]
+        yield ('fkik_chains', None)
 
         # Determine PV position:
-        pv_pos = ori.project_pv(IK_base, amplify=200)
+        pv_pos = ori.project_pv(IK_base, amplify=self.pv_distance)
         self.pv_ctrl_node = ctl.create_control(load_shape='jack', colour='yellow',
-            name=(self.name + "PV_CTRL"))
+            lod=self.control_lod, name=(self.name + "PV_CTRL"))
         self.pv_ctrl_node.translate.set(pv_pos)
-        self.pv_null = ori.create_null(self.pv_ctrl_node)
+        self.pv_null = ori.create_null(self.pv_ctrl_node, offset_matrix=self.offset_matrix)
+        yield ('pole_vector', None)
 
         # Make double constraints with switches.
         #   Make a new controller to hold the switch: 
         self.FKIK_ctrl_node = ctl.create_control(load_shape='jack', colour='white',
-                    name=(self.side_prefix + self.name + "FKIK_CTRL"))
+                    lod=self.control_lod, name=(self.side_prefix + self.name + "FKIK_CTRL"))
 
         switch_pos = pm.xform(bind_end, ws=True, q=True, t=True)
         self.FKIK_ctrl_node.translateX.set(switch_pos[0])
         self.FKIK_ctrl_node.translateY.set(bind_base.translateY.get())
 
         cns.make_float_switch(FK_base, IK_base, bind_base, self.FKIK_ctrl_node, attr_name='FKIK', 
-            float_size=100)
+            float_size=self.switch_size)
         cns.make_float_switch(FK_hinge, IK_hinge, bind_hinge, self.FKIK_ctrl_node, attr_name='FKIK', 
-            float_size=100)
+            float_size=self.switch_size)
         cns.make_float_switch(FK_end, IK_end, bind_end, self.FKIK_ctrl_node, attr_name='FKIK', 
-            float_size=100)
-
-        # Create the nulls for the controllers and build the hierarchy.
-        base_null = ori.create_null(self.plan['base']['control_node'])
-        hinge_null = ori.create_null(self.plan['hinge']['control_node'])
-        end_null = ori.create_null(self.plan['end']['control_node'])
-        pm.parent(hinge_null, self.plan['base']['control_node'])
-        pm.parent(end_null, self.plan['hinge']['control_node'])
+            float_size=self.switch_size)
+        yield ('switches', None)
+
+        # Build the hierarchy, then zero the controllers where they now sit.  The base is zeroed
+        # once it has its final parent, below.
+        pm.parent(self.plan['hinge']['control_node'], self.plan['base']['control_node'])
+        pm.parent(self.plan['end']['control_node'], self.plan['hinge']['control_node'])
+        ori.create_null(self.plan['hinge']['control_node'], offset_matrix=self.offset_matrix)
+        ori.create_null(self.plan['end']['control_node'], offset_matrix=self.offset_matrix)
         ctl.connect_rot(self.plan['base']['control_node'], FK_base)
         ctl.connect_rot(self.plan['hinge']['control_node'], FK_hinge)
         ctl.connect_rot(self.plan['end']['control_node'], FK_end)
+        yield ('fk_controls', None)
 
         # Create controllers for IK arm.  (Not created by the plan, only the FK is.)
         self.IK_base_ctrl = ctl.create_control(
-            load_shape='cube', colour='yellow', name=(self.side_prefix + 'base_CTRL')
+            load_shape='cube', colour='yellow', lod=self.control_lod, 
+            name=(self.side_prefix + 'base_CTRL')
             )
         pm.matchTransform(self.IK_base_ctrl, IK_base, pos=True, rot=False)
         self.IK_end_ctrl = ctl.create_control(
-            load_shape='cube', colour='yellow', name=(self.side_prefix + 'end_CTRL')
+            load_shape='cube', colour='yellow', lod=self.control_lod, 
+            name=(self.side_prefix + 'end_CTRL')
             )
         pm.matchTransform(self.IK_end_ctrl, IK_end, pos=True, rot=False)
 
-        pm.parent(self.IK_end_ctrl, FK_base, IK_base, base_null, bind_base, self.FKIK_ctrl_node, 
-            self.IK_base_ctrl)
+        pm.parent(self.IK_end_ctrl, FK_base, IK_base, self.plan['base']['control_node'], bind_base, 
+            self.FKIK_ctrl_node, self.IK_base_ctrl)
+        ori.create_null(self.plan['base']['control_node'], offset_matrix=self.offset_matrix)
+        yield ('ik_controls', None)
 
         # IK handle.
         solver_handle = pm.ikHandle(sj=IK_base, ee=IK_end, sol='ikRPsolver')[0]
         pm.parent(solver_handle, self.IK_end_ctrl)
         pm.poleVectorConstraint(self.pv_ctrl_node, solver_handle)
+        self.ik_handle = solver_handle
 
+        # Stamp again now the limb-specific nodes exist.
+        self.stamp_metadata()
+        yield ('ik_handle', None)
 
         return
 
 
+    def control_joints(self):
+        '''
+        The FK controls from the plan, plus the IK controls and the joints they drive.  The plan's
+        controls rotate the FK duplicates (see connect_rot), not the bind joints.
+        '''
+
+        pairs = []
+        for entry, fk_joint in zip(('base', 'hinge', 'end'), self.fk_joints):
+            if(self.plan[entry].get('control_node') is not None):
+                pairs.append((self.plan[entry]['control_node'], fk_joint))
+        if(self.IK_end_ctrl is not None):
+            pairs.append((self.IK_end_ctrl, self.ik_joints[-1]))
+        if(self.IK_base_ctrl is not None):
+            pairs.append((self.IK_base_ctrl, self.ik_joints[0]))
+
+        return pairs
+
+    def control_roles(self):
+        '''
+        The plan's FK controls, plus the IK controls, the FKIK switch and the pole vector.
+        '''
+
+        roles = super().control_roles()
+        for control, role in ((self.IK_base_ctrl, 'ik'), (self.IK_end_ctrl, 'ik'), 
+            (self.FKIK_ctrl_node, 'switch'), (self.pv_ctrl_node, 'pole')):
+            if(control is not None):
+                roles[control] = role
+
+        return roles
+
+    def switch_wiring(self):
+        '''
+        One switch per bind joint, blending its FK and IK duplicates from the FKIK attribute.
+        '''
+
+        if(self.FKIK_ctrl_node is None):
+            return []
+
+        return [{'control':self.FKIK_ctrl_node, 'attr':'FKIK', 'fk':fk, 'ik':ik, 'bind':bind,
+            'float_size':self.switch_size} for fk, ik, bind in 
+            zip(self.fk_joints, self.ik_joints, (self.base_joint, self.hinge_joint, self.end_joint))]
+
+    def rest_matrices(self):
+        '''
+        The built limb's rest state as plain data for the headless evaluator (see evaluate.py):
+        world matrices of the bind base, hinge and end, the pole-vector position and the FKIK
+        switch range.
+        '''
+
+        world = []
+        for joint in (self.base_joint, self.hinge_joint, self.end_joint):
+            matrix = joint.getMatrix(worldSpace=True)
+            world.append([[matrix[r][c] for c in range(4)] for r in range(4)])
+
+        return {
+            'world':world,
+            'pole':list(self.pv_ctrl_node.getTranslation(space='world')),
+            'float_size':self.switch_size
+        }
+
+
 class Arm(Limb):
+    PLAN = Limb.PLAN.derive({
+        'base':{'pos':(20.0, 175.0, 0.0), 'name':'shoulder'},
+        'hinge':{'pos':(28.0, 145.0, -4.0), 'name':'elbow'},
+        'end':{'pos':(38.0, 115.0, 0.0), 'name':'wrist'}
+    })
+
     def __init__(self, name="Arm_Module", dir_prefix=''):
         '''
         The least most complicated limb that is still acceptable in the rigging world--
@@ -162,19 +264,10 @@ class Arm(Limb):
         '''
         super().__init__(name=name, dir_prefix=dir_prefix)
 
-        self.plan['base']['pos'] = (20.0, 175.0, 0.0)
-        self.plan['base']['name'] = 'shoulder'
-        self.plan['hinge']['pos'] = (28.0, 145.0, -4.0)
-        self.plan['hinge']['name'] = 'elbow'
-        self.plan['end']['pos'] = (38.0, 115.0, 0.0)
-        self.plan['end']['name'] = 'wrist'
-
         return
 
-    def build_module(self):
-        super().build_module()
-
-        
+    def iter_build_module(self):
+        yield from super().iter_build_module()
 
         print("Arm Module built, as child of limb module.")
 
@@ -182,28 +275,14 @@ class Arm(Limb):
 class Arms:
     def __init__(self, name=""):
         '''
-        A pair of Arms.
+        A pair of Arms.  Only the left arm has placers; the right is built by reflecting it.
         '''
 
         self._left_arm = Arm("L_arm")
-        self._right_arm = Arm("R_arm")
-
-        # Recolour in plan:
-        self._left_arm.plan['base']['control'][2] = 'red'
-        self._left_arm.plan['hinge']['control'][2] = 'red'
-        self._left_arm.plan['end']['control'][2] = 'red'
-        self._right_arm.plan['base']['control'][2] = 'blue'
-        self._right_arm.plan['hinge']['control'][2] = 'blue'
-        self._right_arm.plan['end']['control'][2] = 'blue'
+        self._right_arm = self._left_arm.create_mirror("R_arm")
 
         self._left_arm.build_placers()
-        self._right_arm.build_placers()
 
-        # Now we need to build expressions to make placers mirror on X.
-        for key in self._left_arm.plan:
-            mirror_placer(self._left_arm.plan[key]['placer_node'], 
-            self._right_arm.plan[key]['placer_node'])
-        
     def build(self):
         '''
         Build both arm modules.
@@ -213,15 +292,9 @@ class Arms:
         self._left_arm.build_module()
         self._right_arm.build_module()
 
-        # Recolour some post-plan modules:
-        col.change_colour(self._left_arm.IK_end_ctrl, colour='red')
-        col.change_colour(self._left_arm.IK_base_ctrl, colour='red')
-        col.change_colour(self._right_arm.IK_end_ctrl, colour='blue')
-        col.change_colour(self._right_arm.IK_base_ctrl, colour='blue')
-        col.change_colour(self._left_arm.FKIK_ctrl_node, colour='pale_orange')
-        col.change_colour(self._right_arm.FKIK_ctrl_node, colour='cyan')
+        # Colour both arms by side and role in one pass.
+        sty.restyle([self._left_arm, self._right_arm])
 
         self._left_arm.clean_placers()
-        self._right_arm.clean_placers()
 
         return
@@ -0,0 +1,175 @@
+# metadata.py
+# Created: Sunday, 18th October 2026 10:12:40 am
+# Matthew Riche
+# Last Modified: Sunday, 18th October 2026 10:12:44 am
+# Modified By: Matthew Riche
+
+'''
+Built modules stamp a compact record of themselves onto a rig root node.  Opening the scene later,
+load_modules() turns those records back into live module objects without rebuilding anything.
+'''
+
+import importlib
+import json
+import maya.cmds as cmds
+import pymel.core as pm
+
+from collections.abc import Mapping
+
+
+METADATA_VERSION = 1
+ROOT_NAME = 'rigorist_root'
+ATTR_PREFIX = 'rmod_'
+
+
+def get_rig_root(create=True):
+    '''
+    Find the node that holds module records, making it if needed (and create=True).
+    '''
+
+    if(pm.objExists(ROOT_NAME)):
+        return pm.PyNode(ROOT_NAME)
+
+    if(not create):
+        return None
+
+    return pm.createNode('transform', n=ROOT_NAME)
+
+
+def _encode(value):
+    '''
+    Swap a node (or list of nodes) for UUIDs, which survive renames and re-parenting.  Nodes
+    already deleted, like placers after clean_placers(), are stored as None.
+    '''
+
+    if(value is None):
+        return None
+    if(isinstance(value, (list, tuple))):
+        return [_encode(item) for item in value]
+
+    # A deleted PyNode can't even give its name; a stale name just isn't found.
+    if(isinstance(value, pm.PyNode) and not value.exists()):
+        return None
+    found = cmds.ls(str(value), uuid=True)
+    if(len(found) == 0):
+        return None
+
+    return found[0]
+
+
+def _decode(value):
+    '''
+    Swap UUIDs back for PyNodes.  Nodes deleted since the build come back as None.
+    '''
+
+    if(value is None):
+        return None
+    if(isinstance(value, list)):
+        return [_decode(item) for item in value]
+
+    found = pm.ls(value)
+    if(len(found) == 0):
+        return None
+
+    return found[0]
+
+
+def _split_plan(plan):
+    '''
+    Separate a plan into its plain data and the in-scene nodes it points at (any '_node' key).
+    '''
+
+    data = {}
+    nodes = {}
+
+    for entry in plan:
+        data[entry] = {}
+        for key, value in plan[entry].items():
+            if(key.endswith('_node')):
+                nodes.setdefault(entry, {})[key] = _encode(value)
+            elif(isinstance(value, Mapping)):
+                # Nested settings like 'up_plc' can hold nodes too; only the data is kept.
+                data[entry][key] = {k: v for k, v in value.items() if not k.endswith('_node')}
+            else:
+                data[entry][key] = value
+
+    return data, nodes
+
+
+def stamp_module(module):
+    '''
+    Write the module's type, plan, nodes per role and the metadata version onto the rig root.
+    Stamping again overwrites the module's previous record.
+    '''
+
+    plan, nodes = _split_plan(module.plan)
+
+    record = {
+        'version':METADATA_VERSION,
+        'type':[type(module).__module__, type(module).__name__],
+        'name':module.name,
+        'dir_prefix':module.dir_prefix,
+        'mirror_source':(None if module.mirror_source is None else module.mirror_source.name),
+        'plan':plan,
+        'nodes':nodes,
+        'handles':{attr:_encode(getattr(module, attr, None)) for attr in module.meta_handles}
+    }
+
+    root = get_rig_root()
+    attr_name = ATTR_PREFIX + module.name
+
+    if(pm.hasAttr(root, attr_name) == False):
+        pm.addAttr(root, ln=attr_name, dt='string')
+
+    root.attr(attr_name).set(json.dumps(record, separators=(',', ':')))
+
+    return root.attr(attr_name)
+
+
+def load_modules(root=None):
+    '''
+    Reconstruct every module stamped on the rig root as a live object, keyed by module name.
+    Nothing in the scene is built or changed.
+    '''
+
+    if(root is None):
+        root = get_rig_root(create=False)
+    if(root is None):
+        return {}
+
+    modules = {}
+    mirror_sources = {}
+
+    for attr in pm.listAttr(root, ud=True, st=(ATTR_PREFIX + '*')):
+        record = json.loads(root.attr(attr).get())
+
+        if(record['version'] > METADATA_VERSION):
+            print("Skipping {}; its metadata version {} is newer than this tool's ({}).".format(
+                record['name'], record['version'], METADATA_VERSION))
+            continue
+
+        module_class = getattr(importlib.import_module(record['type'][0]), record['type'][1])
+        module = module_class(name=record['name'], dir_prefix=record['dir_prefix'])
+
+        for entry, data in record['plan'].items():
+            if(entry not in module.plan):
+                module.plan[entry] = {}
+            for key, value in data.items():
+                module.plan[entry][key] = value
+
+        for entry, handles in record['nodes'].items():
+            for key, value in handles.items():
+                module.plan[entry][key] = _decode(value)
+
+        for attr_name, value in record['handles'].items():
+            setattr(module, attr_name, _decode(value))
+
+        modules[module.name] = module
+        mirror_sources[module.name] = record['mirror_source']
+
+    # Mirror links are only resolvable once every module exists.
+    for name, source_name in mirror_sources.items():
+        if(source_name is not None):
+            modules[name].mirror_source = modules.get(source_name)
+
+    return modules
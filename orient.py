@@ -9,15 +9,34 @@ import pymel.core as pm
 import pymel.core.datatypes as dt
 
 
-def create_null(subject):
+def create_null(subject, offset_matrix=False):
     '''
-    Create an empty trans node, and match transform to a target,
-    Then place the target beneath it.
+    Zero out a subject's transforms, keeping it where it is.
+
+    By default an empty trans node is matched to the subject and inserted above it, under the
+    subject's current parent, and is returned.
+    With offset_matrix=True no node is made: the subject's local transform is folded into its
+    offsetParentMatrix and its translate, rotate and scale are reset.  The subject itself is then
+    returned, so callers can treat the result the same way in either mode.  Parent the subject
+    first in this mode; parenting afterwards puts transforms back onto its channels.
     '''
 
+    if(offset_matrix):
+        subject.offsetParentMatrix.set(subject.getMatrix() * subject.offsetParentMatrix.get())
+        subject.translate.set((0.0, 0.0, 0.0))
+        subject.rotate.set((0.0, 0.0, 0.0))
+        subject.scale.set((1.0, 1.0, 1.0))
+        subject.shear.set((0.0, 0.0, 0.0))
+
+        return subject
+
     null_trans = pm.createNode('transform', n=(subject.name() + '_null'))
     pm.matchTransform(null_trans, subject)
 
+    parent = subject.getParent()
+    if(parent is not None):
+        pm.parent(null_trans, parent)
+
     pm.parent(subject, null_trans)
 
     return null_trans
@@ -66,18 +85,40 @@ def aim_at(subject, target, up_vector=(0.0, 0.0, 1.0), up_object=None, aim_axis=
     aim_at(PyNode, PyNode, up_vector=(float, float, float), aim_axis=int, up_axis=int)
     '''
 
+    up_position = None
+    if(up_object is not None):
+        up_position = up_object.getTranslation(space='world')
+
+    new_matrix = aim_matrix(subject.getTranslation(space='world'), 
+        target.getTranslation(space='world'), up_vector=up_vector, up_position=up_position, 
+        aim_axis=aim_axis, up_axis=up_axis)
+    subject.setMatrix(new_matrix, worldSpace=True)
+
+    return
+
+
+def aim_matrix(subject_position, target_position, up_vector=(0.0, 0.0, 1.0), up_position=None, 
+    aim_axis=0, up_axis=2):
+    '''
+    The world matrix aim_at() would give a node at subject_position, worked out from positions
+    alone so it can be previewed without touching any node.  With an up_position, the up-vector
+    points from the subject to it.
+    '''
+
     fix_determinant = False # A flag to fix negative determinants
 
-    subject_position = subject.getTranslation(space='world')
-    target_position = target.getTranslation(space='world')
+    subject_position = dt.Vector(subject_position)
+    target_position = dt.Vector(target_position)
 
-    aim_vector = get_vector(subject, target)
+    aim_vector = (target_position - subject_position)
+    aim_vector.normalize()
 
-    if(up_object is None):
+    if(up_position is None):
         up_vector_scoped = dt.Vector(up_vector) # named to separate it from the arg.
         up_vector_scoped.normalize()
     else:
-        up_vector_scoped = get_vector(subject, up_object)
+        up_vector_scoped = (dt.Vector(up_position) - subject_position)
+        up_vector_scoped.normalize()
 
     last_vector = up_vector_scoped.cross(aim_vector)
     last_vector.normalize()
@@ -142,7 +183,32 @@ def aim_at(subject, target, up_vector=(0.0, 0.0, 1.0), up_object=None, aim_axis=
     trans_row = list(subject_position)
     trans_row.append(1.0)
 
-    new_matrix = dt.Matrix(x_row, y_row, z_row, trans_row)
-    subject.setMatrix(new_matrix, worldSpace=True)
+    return dt.Matrix(x_row, y_row, z_row, trans_row)
+
+
+def mirror_matrix(matrix, mirror_axis='x', behaviour=True):
+    '''
+    Reflect a world matrix across the plane normal to mirror_axis.
+    With behaviour=True all three axes are flipped after reflection, the same as Maya's
+    mirror-behaviour joints, so equal rotations on both sides give mirrored motion.
+
+    usage:
+    mirror_matrix(dt.Matrix, mirror_axis=str, behaviour=bool)
+    '''
+
+    axis_index = ['x', 'y', 'z'].index(mirror_axis)
+
+    rows = [[matrix[r][c] for c in range(4)] for r in range(4)]
+
+    # Reflect every row, including the translation row, across the mirror plane.
+    for row in rows:
+        row[axis_index] = -row[axis_index]
+
+    # Reflection alone leaves a negative determinant; flipping the three axis rows puts it back to
+    # a proper rotation and gives the behaviour mirror.
+    if(behaviour):
+        for row in rows[:3]:
+            for c in range(3):
+                row[c] = -row[c]
 
-    return
\ No newline at end of file
+    return dt.Matrix(rows)
@@ -0,0 +1,129 @@
+# pipeline.py
+# Created: Sunday, 18th October 2026 11:02:15 am
+# Matthew Riche
+# Last Modified: Sunday, 18th October 2026 11:02:19 am
+# Modified By: Matthew Riche
+
+'''
+Drives the step-by-step (generator) builds of RMod modules.  Modules can be interleaved, progress
+is reported per step, and a build can be cancelled between any two steps.  Every step leaves the
+scene consistent, so a cancelled build is a clean partial build that can be undone in one go.
+'''
+
+import pymel.core as pm
+
+
+# The generator method run on each module for a given stage name.
+STAGES = {
+    'placers':'iter_build_placers',
+    'joints':'iter_build_joints',
+    'controls':'iter_build_controls',
+    'module':'iter_build_module'
+}
+
+
+def _blockers(module):
+    '''
+    Modules that must finish before this one may start.
+    '''
+
+    blockers = list(module.dependencies)
+    if(module.mirror_source is not None):
+        blockers.append(module.mirror_source)
+
+    return blockers
+
+
+def iter_builds(modules, stage='module', interleave=True):
+    '''
+    Step through the builds of several modules, yielding (module, step) after each step.
+    A module is only started once every one of its dependencies (and its mirror source) in the
+    same run has finished.  With interleave=True the started modules take turns a step at a time.
+    '''
+
+    if(stage not in STAGES):
+        pm.error("Unknown build stage '{}'; expected one of {}.".format(stage, list(STAGES)))
+
+    pending = list(modules)
+    active = []
+
+    while(pending or active):
+        # Start whichever waiting modules are no longer blocked.
+        running = [module for module, steps in active]
+        for module in list(pending):
+            if(interleave == False and len(active) > 0):
+                break
+            waiting_on = [dep for dep in _blockers(module)
+                if any(dep is other for other in (pending + running))]
+            if(len(waiting_on) == 0):
+                pending.remove(module)
+                active.append((module, getattr(module, STAGES[stage])()))
+                running.append(module)
+
+        if(len(active) == 0):
+            pm.error("Can't build {}; their dependencies are circular.".format(
+                [module.name for module in pending]))
+
+        for module, steps in list(active):
+            try:
+                step = next(steps)
+            except StopIteration:
+                active.remove((module, steps))
+                continue
+
+            yield (module, step)
+
+    return
+
+
+def run_builds(modules, stage='module', interleave=True, progress=True, should_cancel=None,
+    on_step=None):
+    '''
+    Build a list of modules through iter_builds() inside a single undo chunk.
+
+    progress=True shows an interruptable progress window, which also lets the user cancel.
+    should_cancel and on_step are optional callables for custom UIs; should_cancel() is asked
+    between steps, and on_step(module, step) is told of every finished step.
+
+    Returns a dict with the number of steps run and whether the build was cancelled.
+    '''
+
+    # Only an estimate; the number of steps a module takes isn't known until it's built.
+    estimate = max(1, sum(len(module.plan) for module in modules) * (2 if stage == 'module' else 1))
+
+    if(progress):
+        pm.progressWindow(title='Rigorist', status='Building...', isInterruptable=True,
+            progress=0, maxValue=estimate)
+
+    count = 0
+    cancelled = False
+
+    pm.undoInfo(openChunk=True)
+
+    try:
+        for module, step in iter_builds(modules, stage=stage, interleave=interleave):
+            count += 1
+
+            if(on_step is not None):
+                on_step(module, step)
+
+            if(progress):
+                pm.progressWindow(e=True, progress=min(count, estimate),
+                    status="{}: {} {}".format(module.name, step[0], step[1] or ''))
+                if(pm.progressWindow(q=True, isCancelled=True)):
+                    cancelled = True
+
+            if(should_cancel is not None and should_cancel()):
+                cancelled = True
+
+            if(cancelled):
+                print("Build cancelled after {} steps; the last was {} {}.".format(
+                    count, module.name, step))
+                break
+
+    finally:
+        pm.undoInfo(closeChunk=True)
+        if(progress):
+            pm.progressWindow(endProgress=True)
+
+    return {'steps':count, 'cancelled':cancelled}
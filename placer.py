@@ -55,9 +55,10 @@ def mirror_placer(live_placer, matched_placer, mirror_axis='x'):
             live_placer.translateZ >> matched_placer.translateZ
         
     # Build the mirror!
+    # Named from the whole short name; not every placer has a side token to split off.
     multi_div = pm.createNode('multiplyDivide', 
-        n=('{}_mirror_multDiv'.format(live_placer.name().split('_')[1])))
-    multi_div.input2X.set(-1)
+        n=('{}_mirror_multDiv'.format(live_placer.nodeName())))
+    multi_div.attr('input2' + mirror_axis.upper()).set(-1)
 
     if(mirror_axis == 'x'):
         live_placer.translateX >> multi_div.input1X
@@ -0,0 +1,232 @@
+# plans.py
+# Created: Sunday, 18th October 2026 1:20:05 pm
+# Matthew Riche
+# Last Modified: Sunday, 18th October 2026 1:20:09 pm
+# Modified By: Matthew Riche
+
+'''
+Layered plans.  A module class keeps one immutable PlanTemplate that all of its instances share;
+each instance's plan is a PlanLayer that reads through to the template and only stores what that
+instance changes (built nodes, recolours, moved positions).  Hundreds of near-identical modules
+then cost a handful of small dicts each, instead of a full copy of the plan.
+'''
+
+from collections.abc import Mapping, MutableMapping
+from types import MappingProxyType
+
+
+_DELETED = object() # Marks a template key removed by an override layer.
+
+
+class _Overrides(dict):
+    '''
+    An override layer over a nested mapping.  A plain dict stored in a layer is a full replacement
+    value instead.
+    '''
+
+    pass
+
+
+def _freeze(value):
+    '''
+    Make a read-only copy of plan data.  Mappings become mapping proxies and lists become tuples.
+    Already-frozen mappings are shared rather than copied.
+    '''
+
+    if(isinstance(value, MappingProxyType)):
+        return value
+    if(isinstance(value, Mapping)):
+        return MappingProxyType({key:_freeze(item) for key, item in value.items()})
+    if(isinstance(value, (list, tuple))):
+        return tuple(_freeze(item) for item in value)
+
+    return value
+
+
+def _merge(base, overrides):
+    '''
+    Deep-merge overrides over a base mapping.  Untouched branches of the base are kept by reference.
+    '''
+
+    merged = dict(base)
+
+    for key, value in overrides.items():
+        if(isinstance(value, Mapping) and isinstance(base.get(key), Mapping)):
+            merged[key] = _merge(base[key], value)
+        else:
+            merged[key] = value
+
+    return merged
+
+
+class PlanTemplate(Mapping):
+    def __init__(self, entries=None):
+        '''
+        An immutable plan shared by every instance of a module class.
+        '''
+
+        self._entries = _freeze(entries or {})
+
+        return
+
+    def derive(self, overrides):
+        '''
+        Make a new template from this one with nested overrides merged in, e.g. for a subclass:
+            Arm.PLAN = Limb.PLAN.derive({'base':{'name':'shoulder'}})
+        '''
+
+        return PlanTemplate(_merge(self._entries, overrides))
+
+    def __getitem__(self, key):
+        return self._entries[key]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "PlanTemplate({})".format(_thaw(self._entries))
+
+
+class PlanLayer(MutableMapping):
+    __slots__ = ('_base', '_local', '_owner', '_key')
+
+    def __init__(self, base=None, local=None, owner=None, key=None):
+        '''
+        A writable view over a read-only base mapping.  Reads fall through to the base; writes go
+        into a local override layer that is only made on the first write.  Nested mappings come
+        back as nested layers, so plan['base']['up_plc']['placer_node'] = x only copies what it
+        has to.
+        '''
+
+        self._base = (base if base is not None else PlanTemplate())
+        self._local = local
+        self._owner = owner # The layer holding this one, and the key it's held under.
+        self._key = key
+
+        return
+
+    def _peek(self):
+        '''
+        The local layer if one exists yet, without making it.  Another view of the same entry may
+        have made it since this view was handed out.
+        '''
+
+        if(self._local is None and self._owner is not None):
+            owner_local = self._owner._peek()
+            if(owner_local is not None):
+                found = owner_local.get(self._key)
+                if(isinstance(found, _Overrides)):
+                    self._local = found
+
+        return self._local
+
+    def _layer(self):
+        '''
+        The local layer, made (and hooked into the owning layer) if it doesn't exist yet.
+        '''
+
+        if(self._peek() is None):
+            self._local = _Overrides()
+            if(self._owner is not None):
+                self._owner._layer()[self._key] = self._local
+
+        return self._local
+
+    def __getitem__(self, key):
+        local = self._peek()
+
+        if(local is not None and key in local):
+            value = local[key]
+            if(value is _DELETED):
+                raise KeyError(key)
+            if(isinstance(value, _Overrides)):
+                return PlanLayer(self._base[key], value, self, key)
+            return value
+
+        value = self._base[key]
+        if(isinstance(value, Mapping)):
+            return PlanLayer(value, None, self, key)
+
+        return value
+
+    def __setitem__(self, key, value):
+        local = self._peek()
+
+        # Writing back what the base already holds costs nothing.
+        if((local is None or key not in local) and key in self._base):
+            if(_freeze(value) == self._base[key]):
+                return
+
+        self._layer()[key] = value
+
+        return
+
+    def __delitem__(self, key):
+        if(key not in self):
+            raise KeyError(key)
+
+        if(key in self._base):
+            self._layer()[key] = _DELETED
+        else:
+            del self._layer()[key]
+
+        return
+
+    def __contains__(self, key):
+        local = self._peek()
+
+        if(local is not None and key in local):
+            return (local[key] is not _DELETED)
+
+        return (key in self._base)
+
+    def __iter__(self):
+        local = self._peek() or {}
+
+        for key in self._base:
+            if(local.get(key) is not _DELETED):
+                yield key
+
+        for key in local:
+            if(key not in self._base and local[key] is not _DELETED):
+                yield key
+
+        return
+
+    def __len__(self):
+        return sum(1 for key in self)
+
+    def overrides(self):
+        '''
+        Just what this layer changes over its base, as plain data.
+        '''
+
+        return _thaw(self._peek() or {})
+
+    def to_dict(self):
+        '''
+        Materialize the full resolved plan as plain, independent dicts.
+        '''
+
+        return {key:_thaw(self[key]) for key in self}
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+def _thaw(value):
+    '''
+    Plain dict/list copy of resolved plan data.
+    '''
+
+    if(isinstance(value, PlanLayer)):
+        return value.to_dict()
+    if(isinstance(value, Mapping)):
+        return {key:_thaw(item) for key, item in value.items()}
+    if(isinstance(value, tuple)):
+        return tuple(_thaw(item) for item in value)
+
+    return value
@@ -0,0 +1,200 @@
+# preview.py
+# Created: Tuesday, 20th October 2026 11:20:31 am
+# Matthew Riche
+# Last Modified: Tuesday, 20th October 2026 11:20:36 am
+# Modified By: Matthew Riche
+
+'''
+A live preview of the joint orientations a module's placers will give, shown while the placers
+are being moved, before anything is built.
+
+Every plan entry gets a ghost: a small set of axes, linked to its parent's ghost like a skeleton.
+Script jobs watch each placer and up placer.  A move marks only the entries whose orientation
+depends on that placer as dirty: the entry itself, and whichever entries aim at it.  Dirty ghosts
+are updated from an idle callback, within a time budget per update, so dragging stays smooth on
+dense templates; anything left over is picked up on the next idle.
+'''
+
+import time
+import maya.cmds as cmds
+import maya.utils
+import pymel.core as pm
+
+from . import orient as ori
+from . import placer as plc
+
+
+# Per-axis colours for the ghost axes: x, y and z.
+AXIS_COLOURS = (13, 14, 6)
+
+
+class OrientationPreview:
+    def __init__(self, module, budget=0.008, scale=3.0):
+        '''
+        Preview module's joint orientations from its placers.  budget is the time, in seconds,
+        one update may spend on ghosts before yielding back to the viewport.  Ghost axes are scale
+        times each placer's size.
+        '''
+
+        self.module = module
+        self.budget = budget
+        self.scale = scale
+
+        self.parents = {}
+        self.targets = {}
+        self.dependents = {} # placer entry: entries whose ghosts move with it.
+        self.ghosts = {}
+        self.group = None
+        self.jobs = []
+        self.dirty = set()
+        self._scheduled = False
+
+        return
+
+    def start(self):
+        '''
+        Make the ghosts and begin watching the placers.
+        '''
+
+        if(self.module.mirror_source is not None):
+            print("{} is mirrored from {}; preview that instead.".format(self.module.name,
+                self.module.mirror_source.name))
+            return
+        if(len(self.jobs) > 0):
+            return
+
+        plan = self.module.plan
+        self.parents = self.module.joint_parents()
+        self.targets = {entry:self.module.aim_target(entry, self.parents) for entry in plan}
+
+        # An entry depends on its own placers and on the placer it aims at.
+        self.dependents = {entry:{entry} for entry in plan}
+        for entry, target in self.targets.items():
+            if(target is not None):
+                self.dependents[target].add(entry)
+
+        self.group = pm.createNode('transform', n=(self.module.name + '_preview_grp'))
+        self.group.overrideEnabled.set(True)
+        self.group.overrideDisplayType.set(2) # Reference; seen, but not selectable.
+
+        for entry in plan:
+            self.ghosts[entry] = self._make_ghost(entry)
+        for entry in plan:
+            if(self.parents[entry] is not None):
+                link = plc.create_link_vis(self.ghosts[entry], self.ghosts[self.parents[entry]],
+                    colour='grey')
+                pm.parent(link, self.group)
+
+        for entry in plan:
+            watched = [plan[entry]['placer_node']]
+            if('up_plc' in plan[entry]):
+                watched.append(plan[entry]['up_plc']['placer_node'])
+            for node in watched:
+                self.jobs.append(cmds.scriptJob(
+                    attributeChange=[str(node) + '.translate',
+                        (lambda entry=entry: self.mark_dirty(entry))],
+                    killWithScene=True))
+
+        self.dirty = set(plan)
+        self.update()
+
+        print("Previewing orientations of {} ({} entries).".format(self.module.name, len(plan)))
+
+        return
+
+    def _make_ghost(self, entry):
+        '''
+        A set of axes, one coloured line per axis, for an entry.
+        '''
+
+        length = self.module.plan[entry]['placer'][0] * self.scale
+        ghost = cmds.createNode('transform', n=(self.module.plan[entry]['name'] + '_ghost'),
+            p=str(self.group))
+
+        for axis in range(3):
+            tip = [0.0, 0.0, 0.0]
+            tip[axis] = length
+            line = cmds.curve(d=1, p=[(0.0, 0.0, 0.0), tuple(tip)])
+            shape = cmds.listRelatives(line, shapes=True)[0]
+            cmds.setAttr(shape + '.overrideEnabled', True)
+            cmds.setAttr(shape + '.overrideColor', AXIS_COLOURS[axis])
+            cmds.parent(shape, ghost, r=True, s=True)
+            cmds.delete(line)
+
+        return pm.PyNode(ghost)
+
+    def mark_dirty(self, entry):
+        '''
+        Called when one of entry's placers moves; schedules the ghosts that depend on it.
+        '''
+
+        self.dirty |= self.dependents[entry]
+
+        if(not self._scheduled):
+            self._scheduled = True
+            maya.utils.executeDeferred(self.update)
+
+        return
+
+    def update(self):
+        '''
+        Update dirty ghosts until the budget runs out, then leave the rest for the next idle.
+        '''
+
+        self._scheduled = False
+        deadline = time.time() + self.budget
+
+        while(self.dirty and len(self.jobs) > 0):
+            self._update_ghost(self.dirty.pop())
+            if(time.time() > deadline):
+                break
+
+        if(self.dirty and len(self.jobs) > 0):
+            self._scheduled = True
+            maya.utils.executeDeferred(self.update)
+
+        return
+
+    def frame(self, entry):
+        '''
+        The world matrix build_joints() would give entry's joint, from the placers as they stand.
+        '''
+
+        plan = self.module.plan
+        position = cmds.xform(str(plan[entry]['placer_node']), q=True, ws=True, t=True)
+        target = self.targets[entry]
+
+        if('up_plc' not in plan[entry] or target is None):
+            return pm.datatypes.Matrix([[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0],
+                [0.0, 0.0, 1.0, 0.0], list(position) + [1.0]])
+
+        return ori.aim_matrix(position,
+            cmds.xform(str(plan[target]['placer_node']), q=True, ws=True, t=True),
+            up_position=cmds.xform(str(plan[entry]['up_plc']['placer_node']), q=True, ws=True,
+                t=True),
+            aim_axis=plan[entry]['aim'], up_axis=plan[entry]['up'])
+
+    def _update_ghost(self, entry):
+        matrix = self.frame(entry)
+        cmds.xform(str(self.ghosts[entry]), ws=True,
+            m=[matrix[r][c] for r in range(4) for c in range(4)])
+
+        return
+
+    def stop(self):
+        '''
+        Stop watching the placers and delete the ghosts.
+        '''
+
+        for job in self.jobs:
+            if(cmds.scriptJob(exists=job)):
+                cmds.scriptJob(kill=job, force=True)
+        self.jobs = []
+        self.dirty = set()
+
+        if(self.group is not None and pm.objExists(self.group)):
+            pm.delete(self.group)
+        self.group = None
+        self.ghosts = {}
+
+        return
@@ -0,0 +1,393 @@
+# recipe.py
+# Created: Sunday, 18th October 2026 4:05:52 pm
+# Matthew Riche
+# Last Modified: Sunday, 18th October 2026 4:05:58 pm
+# Modified By: Matthew Riche
+
+'''
+Record-and-replay build recipes.
+
+record_build() runs a module's build_module() once and captures everything it left in the scene:
+the new nodes and their hierarchy, every attribute changed from its default, user attributes,
+curve shapes and connections.  That is saved as a JSON recipe.  replay_recipe() stamps the same
+rig back out in bulk, without running any module code, optionally moved to new joint positions.
+
+Nodes the build only parented under or connected to are recorded as external, by name and type.
+So are the shared, scene-wide IK nodes (the solvers and ikSystem), even when the build's first
+ikHandle is what made a solver: they are never part of the recipe's own nodes.  Replay matches
+shared nodes by type, using whichever the target scene already has and making a solver only when
+it has none.  Other externals are matched by name, and replay refuses to start if one is missing.
+
+Replay only moves things; joint orientations stay as they were recorded.  A recipe suits the same
+template across characters of different proportions, not wildly different poses.
+'''
+
+import pymel.core as pm
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+from . import file_ops as fo
+from . import controls as ctl
+from . import metadata as meta
+
+
+RECIPE_VERSION = 2
+ANCHOR_TOLERANCE = 0.001 # How close (in scene units) a node must sit to a joint to follow it.
+CURVE_GEOMETRY_ATTRS = ('controlPoints', 'weights') # Covered by the recorded curve data.
+
+# External node types replay may create when the target scene lacks them.  Solvers are shared
+# scene-wide nodes Maya only makes with the first handle that uses them.
+CREATABLE_EXTERNALS = ('ikRPsolver', 'ikSCsolver', 'ikSplineSolver', 'ikSpringSolver', 
+    'hikSolver')
+
+# Scene-wide singletons: always external, and matched by type rather than name on replay.
+SHARED_TYPES = CREATABLE_EXTERNALS + ('ikSystem',)
+
+
+def _default_values(node_type, cache):
+    '''
+    Attribute defaults for a node type, read once from a throwaway node.
+    '''
+
+    if(node_type in cache):
+        return cache[node_type]
+
+    temp = cmds.createNode(node_type, skipSelect=True)
+    # Creating a shape makes a transform for it too; that's the one to delete.
+    made_parent = cmds.listRelatives(temp, p=True, f=True)
+
+    defaults = {}
+    for attr in (cmds.listAttr(temp, settable=True, scalar=True, multi=True) or []):
+        try:
+            defaults[attr] = cmds.getAttr(temp + '.' + attr)
+        except (RuntimeError, ValueError):
+            pass
+
+    cmds.delete(made_parent or temp)
+    cache[node_type] = defaults
+
+    return defaults
+
+
+def _plug_ref(plug, ids, externals):
+    '''
+    Turn a 'node.attr' plug into [id, attr] for recorded nodes, or [name, attr] for nodes that were
+    already in the scene.  Those are noted in externals, by name, with their type.
+    '''
+
+    node, attr = plug.split('.', 1)
+    long_name = (cmds.ls(node, long=True) or [node])[0]
+
+    if(long_name in ids):
+        return [ids[long_name], attr]
+
+    externals[node] = cmds.nodeType(long_name)
+
+    return [node, attr]
+
+
+def record_build(module, path=None):
+    '''
+    Build the module and record what the build made.  The recipe is returned, and written to
+    path as JSON if given.
+    '''
+
+    before = set(cmds.ls(long=True))
+
+    module.build_module()
+
+    new_nodes = [node for node in cmds.ls(long=True) if node not in before]
+    new_nodes = [node for node in new_nodes if node.split('|')[-1] != meta.ROOT_NAME]
+
+    # A solver the build happened to make is shared, not the module's; it stays external.
+    externals = {}
+    for node in list(new_nodes):
+        if(cmds.nodeType(node) in SHARED_TYPES):
+            externals[node.split('|')[-1]] = cmds.nodeType(node)
+            new_nodes.remove(node)
+
+    # Parents always before children, which is the order they'll be made in on replay.
+    new_nodes.sort(key=lambda node: node.count('|'))
+    ids = {node:index for index, node in enumerate(new_nodes)}
+
+    # Joint positions are the recipe's parameters; anything sitting on a joint follows it.
+    positions = {}
+    for entry in module.plan:
+        joint = module.plan[entry].get('joint_node')
+        if(joint is not None):
+            positions[entry] = list(pm.xform(joint, q=True, ws=True, t=True))
+
+    defaults_cache = {}
+    records = []
+    connections = []
+
+    for node in new_nodes:
+        node_type = cmds.nodeType(node)
+        record = {'type':node_type, 'name':node.split('|')[-1], 'parent':None, 'attrs':{}}
+
+        parent = cmds.listRelatives(node, p=True, f=True)
+        if(parent):
+            record['parent'] = ids.get(parent[0], parent[0])
+            if(parent[0] not in ids):
+                externals[parent[0]] = cmds.nodeType(parent[0])
+
+        if(node_type == 'nurbsCurve'):
+            record['curve'] = ctl.read_curve_shapes([node], space='object')[0]
+
+        for attr_name in (cmds.listAttr(node, ud=True) or []):
+            record.setdefault('user_attrs', []).append({
+                'name':attr_name,
+                'type':cmds.getAttr(node + '.' + attr_name, type=True),
+                'min':(cmds.attributeQuery(attr_name, node=node, min=True)
+                    if cmds.attributeQuery(attr_name, node=node, minExists=True) else None),
+                'max':(cmds.attributeQuery(attr_name, node=node, max=True)
+                    if cmds.attributeQuery(attr_name, node=node, maxExists=True) else None),
+                'keyable':cmds.getAttr(node + '.' + attr_name, keyable=True)
+            })
+
+        # Only what differs from a fresh node of the same type is kept.
+        defaults = _default_values(node_type, defaults_cache)
+        for attr in (cmds.listAttr(node, settable=True, scalar=True, multi=True) or []):
+            try:
+                value = cmds.getAttr(node + '.' + attr)
+            except (RuntimeError, ValueError):
+                continue
+            if(node_type == 'nurbsCurve' and attr.startswith(CURVE_GEOMETRY_ATTRS)):
+                continue
+            if(attr not in defaults or defaults[attr] != value):
+                record['attrs'][attr] = value
+
+        if(cmds.attributeQuery('offsetParentMatrix', node=node, exists=True)):
+            offset = cmds.getAttr(node + '.offsetParentMatrix')
+            if(offset != [float(i % 5 == 0) for i in range(16)]):
+                record['attrs']['offsetParentMatrix'] = offset
+
+        if(cmds.objectType(node, isAType='transform')):
+            world = cmds.xform(node, q=True, ws=True, t=True)
+            for entry, pos in positions.items():
+                if(sum((a - b) ** 2 for a, b in zip(world, pos)) <= ANCHOR_TOLERANCE ** 2):
+                    record['anchor'] = entry
+                    break
+
+        # Incoming connections to every new node, plus anything it feeds outside the recipe.
+        incoming = cmds.listConnections(node, s=True, d=False, c=True, p=True,
+            skipConversionNodes=False) or []
+        for dest, source in zip(incoming[0::2], incoming[1::2]):
+            connections.append([_plug_ref(source, ids, externals), 
+                _plug_ref(dest, ids, externals)])
+
+        outgoing = cmds.listConnections(node, s=False, d=True, c=True, p=True,
+            skipConversionNodes=False) or []
+        for source, dest in zip(outgoing[0::2], outgoing[1::2]):
+            if(cmds.ls(dest.split('.', 1)[0], long=True)[0] not in ids):
+                connections.append([_plug_ref(source, ids, externals), 
+                    _plug_ref(dest, ids, externals)])
+
+        records.append(record)
+
+    recipe = {
+        'version':RECIPE_VERSION,
+        'module':[type(module).__module__, type(module).__name__, module.name],
+        'positions':positions,
+        'nodes':records,
+        'connections':connections,
+        'externals':externals
+    }
+
+    if(path is not None):
+        fo.dump_to_file(recipe, path)
+
+    print("Recorded {} nodes, {} connections and {} external nodes from {}.".format(len(records), 
+        len(connections), len(externals), module.name))
+
+    return recipe
+
+
+def _create_curve_shape(curve, parent, name):
+    '''
+    Make a nurbsCurve shape under an existing transform straight from recorded curve data.
+    '''
+
+    selection = om.MSelectionList()
+    selection.add(parent)
+
+    form = (om.MFnNurbsCurve.kPeriodic if curve['per'] else om.MFnNurbsCurve.kOpen)
+    shape = om.MFnNurbsCurve().create([om.MPoint(*point) for point in curve['points']],
+        curve['knots'], curve['degree'], form, False, False, selection.getDependNode(0))
+
+    shape_fn = om.MFnDagNode(shape)
+    shape_fn.setName(name)
+
+    return shape_fn.fullPathName()
+
+
+def _external_refs(recipe):
+    '''
+    {name: type or None} for every node outside the recipe that it parents to or connects with.
+    Recipes from before externals were recorded give no types.
+    '''
+
+    externals = dict(recipe.get('externals', {}))
+
+    refs = [record['parent'] for record in recipe['nodes']]
+    for source, dest in recipe['connections']:
+        refs += [source[0], dest[0]]
+
+    for ref in refs:
+        if(isinstance(ref, str) and ref not in externals):
+            externals[ref] = None
+
+    return externals
+
+
+def resolve_externals(recipe):
+    '''
+    Match every external node a recipe needs to the scene, before anything is made.
+    Shared nodes are matched by type, preferring one of the recorded name; the rest by name.
+    Returns ({recorded name: scene node}, {recorded name: type}) for the matched nodes and the
+    missing ones replay can create, and errors naming any missing one it can't.
+    '''
+
+    resolved = {}
+    to_create = {}
+    unresolved = []
+
+    for name, node_type in _external_refs(recipe).items():
+        if(node_type in SHARED_TYPES):
+            if(cmds.objExists(name) and cmds.nodeType(name) == node_type):
+                resolved[name] = name
+            elif(cmds.ls(type=node_type)):
+                resolved[name] = cmds.ls(type=node_type)[0]
+            elif(node_type in CREATABLE_EXTERNALS):
+                to_create[name] = node_type
+            else:
+                unresolved.append(name)
+        elif(cmds.objExists(name)):
+            resolved[name] = name
+        else:
+            unresolved.append(name)
+
+    if(unresolved):
+        pm.error("Can't replay this recipe; the scene is missing {}.".format(unresolved))
+
+    return resolved, to_create
+
+
+def _create_external(name, node_type):
+    '''
+    Make a missing shared node the way Maya would, registering solvers with the IK system.
+    '''
+
+    node = cmds.createNode(node_type, n=name, skipSelect=True)
+    if(node_type.endswith('Solver') and cmds.objExists('ikSystem')):
+        cmds.connectAttr(node + '.message', 'ikSystem.ikSolver', nextAvailable=True)
+
+    return node
+
+
+def replay_recipe(recipe, positions=None, replace=None):
+    '''
+    Stamp a recorded build back into the scene.
+
+    recipe is a recipe dict or the path of one.  positions maps plan entries to new world
+    positions for their joints; anything else keeps its recorded position.  replace is an
+    (old, new) pair swapped in every node name, e.g. ('L_', 'R_').
+
+    Returns the list of created node names, in recipe order.
+    '''
+
+    if(isinstance(recipe, str)):
+        recipe = fo.read_from_file(recipe)
+
+    if(recipe is None or recipe['version'] > RECIPE_VERSION):
+        pm.error("Can't replay this recipe; it is missing or from a newer version.")
+
+    # Everything outside the recipe is settled before the first node is made.
+    resolved, to_create = resolve_externals(recipe)
+
+    created = []
+    made_externals = []
+
+    def _name(name):
+        if(replace is not None):
+            return name.replace(replace[0], replace[1])
+        return name
+
+    def _node(ref):
+        return (created[ref] if isinstance(ref, int) else resolved.get(ref, ref))
+
+    pm.undoInfo(openChunk=True)
+
+    try:
+        for name, node_type in to_create.items():
+            resolved[name] = _create_external(name, node_type)
+            made_externals.append(resolved[name])
+
+        # Nodes, parents before children.
+        for record in recipe['nodes']:
+            parent = (None if record['parent'] is None else _node(record['parent']))
+
+            if(record['type'] == 'nurbsCurve' and 'curve' in record):
+                node = _create_curve_shape(record['curve'], parent, _name(record['name']))
+            elif(parent is None):
+                node = cmds.createNode(record['type'], n=_name(record['name']), skipSelect=True)
+            else:
+                node = cmds.createNode(record['type'], n=_name(record['name']), p=parent,
+                    skipSelect=True)
+
+            # Keep full paths, so short names clashing elsewhere in the scene don't matter.
+            created.append((cmds.ls(node, long=True) or [node])[0])
+
+        # User attributes, then every recorded value.  Values set here that a connection drives
+        # are simply overridden once connected.
+        for record, node in zip(recipe['nodes'], created):
+            for user_attr in record.get('user_attrs', []):
+                if(cmds.attributeQuery(user_attr['name'], node=node, exists=True)):
+                    continue
+                flags = {'ln':user_attr['name'], 'k':user_attr['keyable']}
+                if(user_attr['type'] in ('string', 'matrix')):
+                    flags['dt'] = user_attr['type']
+                else:
+                    flags['at'] = user_attr['type']
+                if(user_attr['min'] is not None):
+                    flags['min'] = user_attr['min'][0]
+                if(user_attr['max'] is not None):
+                    flags['max'] = user_attr['max'][0]
+                cmds.addAttr(node, **flags)
+
+            for attr, value in record['attrs'].items():
+                try:
+                    if(attr == 'offsetParentMatrix'):
+                        cmds.setAttr(node + '.' + attr, value, type='matrix')
+                    elif(isinstance(value, str)):
+                        cmds.setAttr(node + '.' + attr, value, type='string')
+                    else:
+                        cmds.setAttr(node + '.' + attr, value)
+                except RuntimeError:
+                    pass
+
+        for source, dest in recipe['connections']:
+            source_plug = _node(source[0]) + '.' + source[1]
+            dest_plug = _node(dest[0]) + '.' + dest[1]
+            if(not cmds.isConnected(source_plug, dest_plug)):
+                cmds.connectAttr(source_plug, dest_plug, force=True)
+
+        # Move anchored nodes, parents first, so children on other anchors are placed last.
+        if(positions):
+            for record, node in zip(recipe['nodes'], created):
+                if(record.get('anchor') in positions):
+                    cmds.xform(node, ws=True, t=positions[record['anchor']])
+
+    except Exception:
+        # Don't leave a half-stamped rig behind.
+        leftovers = [node for node in (created + made_externals) if cmds.objExists(node)]
+        if(leftovers):
+            cmds.delete(leftovers)
+        raise
+
+    finally:
+        pm.undoInfo(closeChunk=True)
+
+    print("Replayed {} nodes.".format(len(created)))
+
+    return created
@@ -0,0 +1,179 @@
+# rigfile.py
+# Created: Tuesday, 20th October 2026 9:14:05 am
+# Matthew Riche
+# Last Modified: Tuesday, 20th October 2026 9:14:11 am
+# Modified By: Matthew Riche
+
+'''
+A compact binary description of a built rig, for tools that shouldn't have to open Maya.
+
+One file holds the joint names and parent indices, the rest local and world matrices as
+contiguous float32 arrays, which joint each control drives, and how every FKIK switch is wired.
+Each section starts on a 64 byte boundary, so load_rig() memory-maps the file and every array is
+a view straight onto it, with nothing copied or parsed.  Names are only decoded when asked for.
+
+Writing is done from plain data (see export.py for walking a scene).  Only NumPy is needed.
+'''
+
+import numpy as np
+
+
+RIG_MAGIC = b'RIGR'
+RIG_VERSION = 1
+ALIGNMENT = 64
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'), ('version', '<u4'),
+    ('joint_count', '<u4'), ('control_count', '<u4'), ('switch_count', '<u4'),
+    ('string_count', '<u4'), ('string_bytes', '<u8'),
+    ('string_offsets', '<u8'), ('strings', '<u8'), ('parents', '<u8'), ('local', '<u8'),
+    ('world', '<u8'), ('controls', '<u8'), ('switches', '<u8')
+])
+
+CONTROL_DTYPE = np.dtype([('name', '<i4'), ('joint', '<i4')])
+
+# Every field but float_size indexes the joint table, apart from control and attr, which index
+# the string table.  The switch reads fully FK at float_size and fully IK at 0.
+SWITCH_DTYPE = np.dtype([('control', '<i4'), ('attr', '<i4'), ('fk', '<i4'), ('ik', '<i4'),
+    ('bind', '<i4'), ('float_size', '<f4')])
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_rig(path, joints, parents, local, world, controls=(), switches=()):
+    '''
+    Write a rig file.
+
+    joints are names and parents their parent's index (-1 for roots).  local and world are
+    (J, 4, 4) row-major matrices.  controls are (control name, joint index) pairs, and switches
+    are dicts of control, attr, fk, ik, bind (joint indices) and float_size.
+    Returns the number of bytes written.
+    '''
+
+    # Joint names come first in the string table, so a joint's index is also its name's.
+    strings = list(joints)
+    string_index = {name:i for i, name in enumerate(strings)}
+
+    def _intern(name):
+        if(name not in string_index):
+            string_index[name] = len(strings)
+            strings.append(name)
+        return string_index[name]
+
+    control_table = np.array([(_intern(name), joint) for name, joint in controls],
+        dtype=CONTROL_DTYPE)
+    switch_table = np.array([(_intern(switch['control']), _intern(switch['attr']), switch['fk'],
+        switch['ik'], switch['bind'], switch['float_size']) for switch in switches],
+        dtype=SWITCH_DTYPE)
+
+    encoded = [name.encode('utf-8') for name in strings]
+    string_offsets = np.concatenate([[0], np.cumsum([len(name) for name in encoded])]).astype('<u8')
+    string_data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+    sections = [
+        ('string_offsets', string_offsets),
+        ('strings', string_data),
+        ('parents', np.asarray(parents, dtype='<i4')),
+        ('local', np.asarray(local, dtype='<f4').reshape(-1, 4, 4)),
+        ('world', np.asarray(world, dtype='<f4').reshape(-1, 4, 4)),
+        ('controls', control_table),
+        ('switches', switch_table)
+    ]
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header['magic'] = RIG_MAGIC
+    header['version'] = RIG_VERSION
+    header['joint_count'] = len(joints)
+    header['control_count'] = len(control_table)
+    header['switch_count'] = len(switch_table)
+    header['string_count'] = len(strings)
+    header['string_bytes'] = len(string_data)
+
+    offset = _aligned(HEADER_DTYPE.itemsize)
+    for name, data in sections:
+        header[name] = offset
+        offset = _aligned(offset + data.nbytes)
+
+    with open(path, 'wb') as rig_file:
+        rig_file.write(header.tobytes())
+        for name, data in sections:
+            rig_file.seek(int(header[name][0]))
+            rig_file.write(np.ascontiguousarray(data).tobytes())
+        rig_file.truncate(offset)
+
+    return offset
+
+
+class RigFile:
+    def __init__(self, path):
+        '''
+        A memory-mapped rig file.  parents, local, world, controls and switches are read-only
+        arrays viewing the file directly.
+        '''
+
+        self.path = path
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r')
+
+        header = np.frombuffer(self._buffer, dtype=HEADER_DTYPE, count=1)[0]
+        if(header['magic'] != RIG_MAGIC):
+            raise ValueError("{} is not a rig file.".format(path))
+        if(header['version'] > RIG_VERSION):
+            raise ValueError("{} is rig file version {}; this reader knows up to {}.".format(
+                path, header['version'], RIG_VERSION))
+        self.header = header
+
+        joint_count = int(header['joint_count'])
+        self._string_offsets = self._view('string_offsets', '<u8', int(header['string_count']) + 1)
+        self._strings = self._view('strings', np.uint8, int(header['string_bytes']))
+        self.parents = self._view('parents', '<i4', joint_count)
+        self.local = self._view('local', '<f4', joint_count * 16).reshape(joint_count, 4, 4)
+        self.world = self._view('world', '<f4', joint_count * 16).reshape(joint_count, 4, 4)
+        self.controls = self._view('controls', CONTROL_DTYPE, int(header['control_count']))
+        self.switches = self._view('switches', SWITCH_DTYPE, int(header['switch_count']))
+
+        return
+
+    def _view(self, section, dtype, count):
+        return np.frombuffer(self._buffer, dtype=dtype, count=count,
+            offset=int(self.header[section]))
+
+    def __len__(self):
+        return len(self.parents)
+
+    def name(self, index):
+        '''
+        The string at index in the string table; joints come first.
+        '''
+
+        start, end = self._string_offsets[index], self._string_offsets[index + 1]
+
+        return self._strings[start:end].tobytes().decode('utf-8')
+
+    @property
+    def joint_names(self):
+        return [self.name(i) for i in range(len(self))]
+
+    def find_joint(self, name):
+        '''
+        Index of the named joint, or -1.
+        '''
+
+        encoded = np.frombuffer(name.encode('utf-8'), dtype=np.uint8)
+        lengths = np.diff(self._string_offsets[:len(self) + 1])
+
+        for i in np.flatnonzero(lengths == len(encoded)):
+            start = self._string_offsets[i]
+            if(np.array_equal(self._strings[start:start + len(encoded)], encoded)):
+                return int(i)
+
+        return -1
+
+
+def load_rig(path):
+    '''
+    Memory-map a rig file written by write_rig().
+    '''
+
+    return RigFile(path)
@@ -17,12 +17,21 @@ import pymel.core.datatypes as dt
 from . placer import *
 from . import orient as ori
 from . import controls as ctl
+from . import metadata as meta
+from . plans import PlanTemplate, PlanLayer
 
 import pprint
 
 
 class RMod:
-    def __init__(self, name="Generic_RModule", dir_prefix='', mirror=False):
+    # Attributes holding in-scene nodes outside of the plan, recorded by stamp_metadata().
+    meta_handles = ()
+
+    # The plan shared by every instance of a module class.  Subclasses replace it, usually with
+    # ParentClass.PLAN.derive({...}).
+    PLAN = PlanTemplate()
+
+    def __init__(self, name="Generic_RModule", dir_prefix='', mirror=False, mirror_axis='x'):
         '''
         Generic module.  Each one will know where it's placers should go, and have a rather 
         vanilla build-script
@@ -33,14 +42,19 @@ class RMod:
         self.dir_prefix = dir_prefix
 
         # Using a "plan" dict, we have both placers to be made, and the joints and controls they
-        # make.
+        # make.  It reads through to the class PLAN and only stores this instance's changes.
 
-        self.plan = {}
+        self.plan = PlanLayer(self.PLAN)
 
         self.dependencies = [] # Modules that must be built first.
         self.build_nodes = [] # Nodes in-scene built by this module.
         self.clean_up_nodes = [] # Nodes to be quickly cleaned up after build process.
         self.reverse_axis = [] # Which axis to reverse in the case of mirroring.
+        self.mirror = mirror
+        self.mirror_axis = mirror_axis # The axis reflected across when building a mirror.
+        self.mirror_source = None # A built module this one is reflected from, instead of placers.
+        self.control_lod = None # Shape LOD for this module's controls; None uses the rig default.
+        self.offset_matrix = False # Zero controls by offsetParentMatrix instead of _null nodes.
 
         # If the side chosen is 'r_' then we put in a reverse axis of x.
         if('r' in self.side_prefix.lower()):
@@ -48,20 +62,48 @@ class RMod:
 
         return
 
-    def build_placers(self):
+    def build_placers(self, positions=None):
         '''
         Run through all the placers in placer_list and create them in the scene.
+        positions optionally maps plan entries to world positions to use instead of the plan's, 
+        e.g. from fitting.fit_module().
+        '''
+
+        for step in self.iter_build_placers(positions=positions):
+            pass
+
+        return
+
+    def default_position(self, entry):
+        '''
+        Where the plan puts an entry's placer for this module's side.
+        '''
+
+        build_pos = self.plan[entry]['pos']
+        if('r_' in self.side_prefix.lower()):
+            build_pos = (-build_pos[0], build_pos[1], build_pos[2])
+
+        return build_pos
+
+    def iter_build_placers(self, positions=None):
+        '''
+        Generator form of build_placers(); yields ('placers', entry) once each placer is made.
         '''
 
+        if(self.mirror_source is not None):
+            print("{} is mirrored from {}; it has no placers.".format(self.name, 
+                self.mirror_source.name))
+            return
+
         pprint.pprint (self.plan)
 
         for entry in self.plan:
             print("Building {}".format(self.plan[entry]['name']))
             print("Placer is {}".format(self.plan[entry]['placer']))
 
-            build_pos = self.plan[entry]['pos']
-            if('r_' in self.side_prefix.lower()):
-                build_pos = (-build_pos[0], build_pos[1], build_pos[2])
+            build_pos = self.default_position(entry)
+            if(positions is not None and entry in positions):
+                build_pos = tuple(positions[entry])
 
             new_placer = create_placer(pos=(build_pos), 
                 size=self.plan[entry]['placer'][0],
@@ -88,6 +130,9 @@ class RMod:
                 link = create_link_vis(new_placer, up_placer, colour='grey')
                 self.clean_up_nodes.append(link)
                 pm.parent(up_placer, new_placer)
+
+            yield ('placers', entry)
+
         return
 
     def build_joints(self):
@@ -95,33 +140,179 @@ class RMod:
         Using the self.joint_plan, make joints, orient and parent them according to the data.
         '''
 
-        last_built = None
-        pm.select(cl=True)
+        for step in self.iter_build_joints():
+            pass
+
+        return
+
+    def joint_parents(self):
+        '''
+        Map every plan entry to the entry its joint is parented under (None for a root).
+        Entries name theirs with a 'parent' key, which lets one plan hold a whole tree (a hand and 
+        all its fingers, say).  If no entry has a 'parent' key, the plan is one chain in order.
+        '''
+
+        explicit = any(('parent' in self.plan[entry]) for entry in self.plan)
+
+        parents = {}
+        previous = None
+
+        for entry in self.plan:
+            if(explicit):
+                parents[entry] = self.plan[entry].get('parent')
+                if(parents[entry] is not None and parents[entry] not in self.plan):
+                    pm.error("'{}' names a parent '{}' that isn't in the plan of {}.".format(
+                        entry, parents[entry], self.name))
+            else:
+                parents[entry] = previous
+            previous = entry
+
+        return parents
+
+    def build_order(self, parents=None):
+        '''
+        Plan entries ordered so that every parent comes before its children, siblings keeping plan
+        order.
+        '''
+
+        if(parents is None):
+            parents = self.joint_parents()
 
+        children = {}
         for entry in self.plan:
+            children.setdefault(parents[entry], []).append(entry)
+
+        order = []
+        queue = list(children.get(None, []))
+        while(queue):
+            entry = queue.pop(0)
+            order.append(entry)
+            queue += children.get(entry, [])
+
+        if(len(order) != len(self.plan)):
+            pm.error("The plan of {} has a parenting loop around {}.".format(
+                self.name, [entry for entry in self.plan if entry not in order]))
+
+        return order
+
+    def aim_target(self, entry, parents=None):
+        '''
+        The plan entry a joint aims at when oriented: its 'child' if named, else its first child, 
+        else back at its parent.  None if it has neither.
+        '''
+
+        if('child' in self.plan[entry]):
+            return self.plan[entry]['child']
+
+        if(parents is None):
+            parents = self.joint_parents()
+
+        for other in self.plan:
+            if(parents[other] == entry):
+                return other
+
+        return parents[entry]
+
+    def iter_build_joints(self):
+        '''
+        Generator form of build_joints(); yields ('joints', entry) once each joint is made and
+        oriented, then ('hierarchy', None) once the whole tree is parented.
+
+        Joints are made in build_order(), unparented, so each is oriented in world space on its own 
+        branch.  The tree is then assembled with one parent call per parent joint, and frozen from 
+        the roots in one go.  Nothing here depends on the selection, so other work can run between 
+        steps.
+        '''
+
+        parents = self.joint_parents()
+        order = self.build_order(parents)
+
+        # A mirrored module reads no placers; every matrix is reflected up front, in one pass.
+        if(self.mirror_source is not None):
+            matrices = self.mirrored_matrices()
+
+        for entry in order:
             print("Building {}".format(self.plan[entry]['name']))
 
-            new_joint = pm.joint(n=(self.side_prefix + self.plan[entry]['name']))
-            pm.matchTransform(new_joint, self.plan[entry]['placer_node'])
-            # Orient the joint by aiming at a target with a specified up-vector placer.
+            new_joint = pm.createNode('joint', n=(self.side_prefix + self.plan[entry]['name']))
             self.plan[entry]['joint_node'] = new_joint
 
-            if('up_plc' in self.plan[entry]):
-                if('child' not in self.plan[entry]):
-                    print("{} has no child, so aiming it at {}.".format(new_joint, last_built))
-                    ori.aim_at(new_joint, 
-                        last_built, up_object=self.plan[entry]['up_plc']['placer_node'], 
-                        aim_axis=self.plan[entry]['aim'], 
-                        up_axis=self.plan[entry]['up'])
-
-                else:
-                    ori.aim_at(new_joint, self.plan[self.plan[entry]['child']]['placer_node'], 
+            if(self.mirror_source is not None):
+                new_joint.setMatrix(matrices[entry], worldSpace=True)
+
+            else:
+                pm.matchTransform(new_joint, self.plan[entry]['placer_node'])
+
+                # Orient the joint by aiming at a target with a specified up-vector placer.
+                target = self.aim_target(entry, parents)
+                if('up_plc' in self.plan[entry] and target is not None):
+                    if(target == parents[entry]):
+                        print("{} has no child, so aiming it at {}.".format(new_joint, target))
+                    ori.aim_at(new_joint, self.plan[target]['placer_node'], 
                         up_object=self.plan[entry]['up_plc']['placer_node'], 
                         aim_axis=self.plan[entry]['aim'], up_axis=self.plan[entry]['up'])
 
-            pm.makeIdentity(a=True)
+            yield ('joints', entry)
+
+        # Assemble the tree, parents first so each parent call keeps the world positions.
+        children = {}
+        for entry in order:
+            if(parents[entry] is not None):
+                children.setdefault(parents[entry], []).append(self.plan[entry]['joint_node'])
+
+        for entry in order:
+            if(entry in children):
+                pm.parent(children[entry], self.plan[entry]['joint_node'])
 
-            last_built = new_joint
+        roots = [self.plan[entry]['joint_node'] for entry in order if parents[entry] is None]
+        pm.makeIdentity(roots, a=True)
+
+        yield ('hierarchy', None)
+
+        return
+
+    def mirrored_matrices(self):
+        '''
+        Reflect the world matrices of self.mirror_source's built joints across self.mirror_axis.
+        No placers are read and no aim solve is run; the source side has already done that work.
+        '''
+
+        source_plan = self.mirror_source.plan
+
+        matrices = {}
+        for entry in self.plan:
+            source_joint = source_plan[entry].get('joint_node')
+            if(source_joint is None):
+                pm.error("{} has no built joint for '{}'; build it before its mirror.".format(
+                    self.mirror_source.name, entry))
+            matrices[entry] = ori.mirror_matrix(source_joint.getMatrix(worldSpace=True), 
+                mirror_axis=self.mirror_axis)
+
+        return matrices
+
+    def create_mirror(self, name):
+        '''
+        Make the opposite-side twin of this module.  The twin builds no placers; once this module 
+        is built, the twin's joints and controls are reflected from it.
+        '''
+
+        mirrored = type(self)(name=name, dir_prefix=self.dir_prefix)
+        mirrored.mirror_axis = self.mirror_axis
+        mirrored.control_lod = self.control_lod
+        mirrored.offset_matrix = self.offset_matrix
+        mirrored.mirror_source = self
+
+        return mirrored
+
+    def recolour_controls(self, colour):
+        '''
+        Set the colour of every control in this module's plan, before it is built.
+        '''
+
+        for entry in self.plan:
+            if('control' in self.plan[entry]):
+                shape, size = self.plan[entry]['control'][:2]
+                self.plan[entry]['control'] = (shape, size, colour)
 
         return
 
@@ -131,16 +322,31 @@ class RMod:
         joints.
         '''
 
+        for step in self.iter_build_controls():
+            pass
+
+        return
+
+    def iter_build_controls(self):
+        '''
+        Generator form of build_controls(); yields ('controls', entry) after each plan entry.
+        '''
+
         for entry in self.plan:
             if('control' in self.plan[entry]):
                 new_ctrl = ctl.create_control(load_shape=self.plan[entry]['control'][0],
-                    colour=self.plan[entry]['control'][2],
+                    colour=self.plan[entry]['control'][2], lod=self.control_lod,
                     name=(self.side_prefix + self.plan[entry]['name'] + "_CTRL"))
                 pm.matchTransform(new_ctrl, self.plan[entry]['joint_node'])
                 pm.scale(new_ctrl, self.plan[entry]['control'][1])
-                pm.makeIdentity(a=True, s=True)
+                pm.makeIdentity(new_ctrl, a=True, s=True)
+                # Costs no extra node, so controls are always zeroed in this mode.
+                if(self.offset_matrix):
+                    ori.create_null(new_ctrl, offset_matrix=True)
             self.plan[entry]['control_node'] = new_ctrl
 
+            yield ('controls', entry)
+
         return
 
     def build_module(self):
@@ -148,19 +354,67 @@ class RMod:
         Run through all build instructions to create this module in-scene.
         '''
 
+        for step in self.iter_build_module():
+            pass
+
+        return
+
+    def iter_build_module(self):
+        '''
+        Generator form of build_module(); yields a (stage, entry) tuple after every step, so a 
+        driver like pipeline.run_builds() can report progress, interleave modules, or stop 
+        between steps.  Subclasses extend this rather than build_module().
+        '''
+
         # This module on the generic level can't go beyond checking if everything is still in
         # the scene.
 
         print("Building module {}".format(self.name))
         print("Building joints of {}.".format(self.name))
-        self.build_joints()
+        yield from self.iter_build_joints()
         print("Building the controls of {}.".format(self.name))
-        self.build_controls()
+        yield from self.iter_build_controls()
+        self.stamp_metadata()
+        yield ('metadata', None)
 
         print("     ...Done.")
 
         return
 
+    def control_joints(self):
+        '''
+        (control, joint) pairs for every built control that drives a joint of this module.
+        '''
+
+        return [(self.plan[entry]['control_node'], self.plan[entry]['joint_node']) 
+            for entry in self.plan 
+            if(self.plan[entry].get('control_node') is not None and 
+                self.plan[entry].get('joint_node') is not None)]
+
+    def control_roles(self):
+        '''
+        Every built control of this module mapped to its role, for style.restyle().  The plan's
+        controls are all 'main' on the generic module.
+        '''
+
+        return {self.plan[entry]['control_node']:'main' for entry in self.plan 
+            if(self.plan[entry].get('control_node') is not None)}
+
+    def switch_wiring(self):
+        '''
+        The FK/IK switches this module built, as dicts of control, attr, fk, ik and bind nodes and
+        the switch's float_size.  The generic module has none.
+        '''
+
+        return []
+
+    def stamp_metadata(self):
+        '''
+        Record this module on the rig root so it can be reloaded later with metadata.load_modules().
+        '''
+
+        return meta.stamp_module(self)
+
     def clean_placers(self):
         '''
         Delete all in-scene placers relating to this module.
@@ -169,7 +423,7 @@ class RMod:
         print("Deleting placers.")
 
         for key in self.plan:
-            if(self.plan[key]['placer_node'] != None):
+            if(self.plan[key].get('placer_node') != None):
                 pm.delete(self.plan[key]['placer_node'])
 
         for item in self.clean_up_nodes:
@@ -0,0 +1,268 @@
+# shape_lod.py
+# Created: Sunday, 18th October 2026 2:41:30 pm
+# Matthew Riche
+# Last Modified: Sunday, 18th October 2026 2:41:36 pm
+# Modified By: Matthew Riche
+
+'''
+Level-of-detail variants for the shapes in control_shapes/.
+
+Each stored shape can carry a 'lods' list next to its original data.  Level 1 is the first entry,
+level 2 the second and so on; level 0 is always the original.  Every level is the cheapest curve
+found that stays within its tolerance of the original, measured as a fraction of the shape's
+bounding-box diagonal.  A level that wouldn't cut the CV count by at least MIN_REDUCTION isn't
+stored, so a shape all of whose corners matter may carry fewer levels, or none; asking for a
+missing level gives the coarsest stored one.  controls.create_control(lod=...) picks a level when
+building.
+
+This needs NumPy, but not Maya, so libraries can be re-optimized from a plain Python batch.
+'''
+
+import os
+import numpy as np
+
+from . import file_ops as fo
+
+
+# Deviation allowed per level, as a fraction of the shape's bounding-box diagonal.
+DEFAULT_TOLERANCES = (0.01, 0.03, 0.08)
+
+# The fraction of CVs a level must drop, from the level before it, to be worth storing.
+MIN_REDUCTION = 0.25
+
+
+def _full_knots(knots, degree):
+    '''
+    Maya stores two fewer knots than the textbook definition; pad one on either end.
+    The padding knots never affect the curve.
+    '''
+
+    knots = [float(k) for k in knots]
+
+    return np.array([knots[0]] + knots + [knots[-1]])
+
+
+def _basis_matrix(full_knots, degree, params):
+    '''
+    B-spline basis functions for every param at once, as a (len(params), cv count) matrix.
+    '''
+
+    count = len(full_knots) - degree - 1
+    params = np.asarray(params, dtype=float)
+
+    # Degree zero, with the very end of the domain belonging to the last non-empty span.
+    basis = np.zeros((len(params), len(full_knots) - 1))
+    for i in range(len(full_knots) - 1):
+        if(full_knots[i] < full_knots[i + 1]):
+            basis[:, i] = (params >= full_knots[i]) & (params < full_knots[i + 1])
+    end = full_knots[count]
+    last_span = np.nonzero(full_knots[:-1] < end)[0][-1]
+    basis[params >= end, :] = 0.0
+    basis[params >= end, last_span] = 1.0
+
+    for d in range(1, degree + 1):
+        raised = np.zeros((len(params), len(full_knots) - d - 1))
+        for i in range(len(full_knots) - d - 1):
+            left_span = full_knots[i + d] - full_knots[i]
+            right_span = full_knots[i + d + 1] - full_knots[i + 1]
+            if(left_span > 0):
+                raised[:, i] += (params - full_knots[i]) / left_span * basis[:, i]
+            if(right_span > 0):
+                raised[:, i] += (full_knots[i + d + 1] - params) / right_span * basis[:, i + 1]
+        basis = raised
+
+    return basis[:, :count]
+
+
+def sample_shape(shape, per_span=16):
+    '''
+    Dense points along a stored shape, as an (N, 3) array.
+    '''
+
+    points = np.asarray(shape['points'], dtype=float)
+    degree = shape['degree']
+
+    if(degree == 1):
+        steps = np.linspace(0.0, 1.0, per_span, endpoint=False)
+        starts = points[:-1, None, :]
+        ends = points[1:, None, :]
+        dense = (starts + (ends - starts) * steps[None, :, None]).reshape(-1, 3)
+        return np.vstack([dense, points[-1:]])
+
+    full_knots = _full_knots(shape['knots'], degree)
+    start = full_knots[degree]
+    end = full_knots[len(points)]
+    params = np.linspace(start, end, (len(points) - degree) * per_span + 1)
+
+    return _basis_matrix(full_knots, degree, params) @ points
+
+
+def deviation(samples_a, samples_b, chunk=2048):
+    '''
+    Symmetric worst-case distance between two dense samplings (a discrete Hausdorff distance).
+    '''
+
+    def _one_way(source, target):
+        worst = 0.0
+        for i in range(0, len(source), chunk):
+            block = source[i:i + chunk]
+            dists = np.linalg.norm(block[:, None, :] - target[None, :, :], axis=2)
+            worst = max(worst, float(dists.min(axis=1).max()))
+        return worst
+
+    return max(_one_way(samples_a, samples_b), _one_way(samples_b, samples_a))
+
+
+def _simplify_polyline(points, tolerance):
+    '''
+    Douglas-Peucker: indices of the points kept so no dropped point strays beyond tolerance.
+    '''
+
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+
+    while(stack):
+        first, last = stack.pop()
+        if(last - first < 2):
+            continue
+
+        inner = points[first + 1:last]
+        start = points[first]
+        segment = points[last] - start
+        length_sq = float(segment @ segment)
+
+        if(length_sq == 0.0):
+            dists = np.linalg.norm(inner - start, axis=1)
+        else:
+            t = np.clip(((inner - start) @ segment) / length_sq, 0.0, 1.0)
+            dists = np.linalg.norm(inner - (start + t[:, None] * segment), axis=1)
+
+        worst = int(np.argmax(dists))
+        if(dists[worst] > tolerance):
+            split = first + 1 + worst
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+
+    return np.nonzero(keep)[0]
+
+
+def _linear_shape(points):
+    return {
+        'points':[list(map(float, p)) for p in points],
+        'knots':[float(k) for k in range(len(points))],
+        'degree':1,
+        'per':False
+    }
+
+
+def _fit_bspline(samples, count, degree):
+    '''
+    Least-squares fit of an open, uniform, clamped B-spline with count CVs to ordered samples,
+    using chord-length parameters.  The end CVs are pinned to the ends of the samples.
+    '''
+
+    spans = count - degree
+    maya_knots = ([0.0] * (degree - 1) + [float(k) for k in range(spans + 1)] +
+        [float(spans)] * (degree - 1))
+    full_knots = _full_knots(maya_knots, degree)
+
+    chords = np.linalg.norm(np.diff(samples, axis=0), axis=1)
+    params = np.concatenate([[0.0], np.cumsum(chords)])
+    params = params / params[-1] * spans
+
+    basis = _basis_matrix(full_knots, degree, params)
+    # Move the pinned end CVs over to the right-hand side and solve for the interior ones.
+    rhs = samples - np.outer(basis[:, 0], samples[0]) - np.outer(basis[:, -1], samples[-1])
+    inner = np.linalg.lstsq(basis[:, 1:-1], rhs, rcond=None)[0]
+    points = np.vstack([samples[:1], inner, samples[-1:]])
+
+    return {
+        'points':[list(map(float, p)) for p in points],
+        'knots':maya_knots,
+        'degree':degree,
+        'per':False
+    }
+
+
+def make_lods(shape, tolerances=DEFAULT_TOLERANCES):
+    '''
+    Build up to one reduced shape per tolerance.  Each level is the fewer-CV result of a polyline
+    simplification and (for curved shapes) a cubic refit.  Levels that don't drop MIN_REDUCTION of
+    the CVs of the level before them are left out, so periodic shapes get none.
+    '''
+
+    original = sample_shape(shape)
+    size = float(np.linalg.norm(original.max(axis=0) - original.min(axis=0))) or 1.0
+    points = np.asarray(shape['points'], dtype=float)
+
+    levels = []
+    previous = {key:shape[key] for key in ('points', 'knots', 'degree', 'per')}
+
+    for tolerance in tolerances:
+        limit = tolerance * size
+        candidates = [previous]
+
+        if(shape['per'] == False):
+            # Douglas-Peucker only bounds the dropped points, so tighten until the whole result
+            # checks out against the original.
+            source = (points if shape['degree'] == 1 else original)
+            simplify_limit = limit
+            for attempt in range(8):
+                simplified = _linear_shape(source[_simplify_polyline(source, simplify_limit)])
+                if(deviation(original, sample_shape(simplified)) <= limit):
+                    candidates.append(simplified)
+                    break
+                simplify_limit *= 0.5
+
+            if(shape['degree'] > 1):
+                for count in range(shape['degree'] + 1, len(previous['points'])):
+                    fitted = _fit_bspline(original, count, shape['degree'])
+                    if(deviation(original, sample_shape(fitted)) <= limit):
+                        candidates.append(fitted)
+                        break
+
+        best = min(candidates, key=lambda candidate: len(candidate['points']))
+        if(len(best['points']) <= (1.0 - MIN_REDUCTION) * len(previous['points'])):
+            levels.append(dict(best, tolerance=tolerance))
+            previous = best
+
+    return levels
+
+
+def optimize_library(names=None, tolerances=DEFAULT_TOLERANCES, write=True):
+    '''
+    Generate and store LOD levels for shapes in control_shapes/ (all of them if names is None).
+    Returns {name: [cv count per level, original first]}; multi-shape entries count every shape,
+    and a level a shape doesn't store counts as its coarsest, as pick_lod() would give it.
+    '''
+
+    def _level_count(part, level):
+        if(level == 0 or len(part['lods']) == 0):
+            return len(part['points'])
+        return len(part['lods'][min(level, len(part['lods'])) - 1]['points'])
+
+    shape_dir = fo.get_path() + '/control_shapes/'
+    if(names is None):
+        names = [f[:-5] for f in sorted(os.listdir(shape_dir)) if f.endswith('.json')]
+
+    report = {}
+
+    for name in names:
+        path = shape_dir + name + '.json'
+        shape = fo.read_from_file(path)
+        if(shape is None):
+            continue
+
+        # Multi-shape entries get levels per shape, which is where create_control looks for them.
+        parts = shape.get('shapes', [shape])
+        for part in parts:
+            part['lods'] = make_lods(part, tolerances=tolerances)
+        report[name] = [sum(_level_count(part, level) for part in parts) 
+            for level in range(len(tolerances) + 1)]
+
+        if(write):
+            fo.dump_to_file(shape, path)
+
+    return report
@@ -0,0 +1,119 @@
+# spatial.py
+# Created: Monday, 19th October 2026 2:20:44 pm
+# Matthew Riche
+# Last Modified: Monday, 19th October 2026 2:20:51 pm
+# Modified By: Matthew Riche
+
+'''
+A uniform-grid spatial index over point clouds, in NumPy alone.
+
+Points are bucketed into cubic cells once (a single sort), and radius queries only look at the
+cells a query sphere overlaps.  This serves mesh-fitting (millions of vertices, a few dozen
+queries) and symmetry pairing (thousands of points queried against each other) equally well.
+'''
+
+import numpy as np
+
+
+class GridIndex:
+    # Floor on the cell size, as a fraction of the longest axis of the points' bounding box.
+    MIN_CELL_FRACTION = 0.001
+
+    def __init__(self, points, cell_size=None, per_cell=8):
+        '''
+        Index (N, 3) points.  Without a cell_size, cells are sized to hold about per_cell points
+        each, on average, across the bounding box; flat or straight point sets are measured by the
+        axes they actually spread along.  Cells are never smaller than MIN_CELL_FRACTION of the
+        longest axis.
+        '''
+
+        self.points = np.ascontiguousarray(points, dtype=float).reshape(-1, 3)
+        self.origin = (self.points.min(axis=0) if len(self.points) else np.zeros(3))
+        extent = ((self.points.max(axis=0) - self.origin) if len(self.points) else np.zeros(3))
+
+        longest = float(extent.max())
+        spread = extent[extent > longest * self.MIN_CELL_FRACTION]
+
+        if(cell_size is None and len(spread) > 0):
+            volume = float(np.prod(spread))
+            cell_size = (volume * per_cell / max(len(self.points), 1)) ** (1.0 / len(spread))
+        elif(cell_size is None):
+            cell_size = 1.0 # Every point is in the same spot; one cell holds them all.
+
+        self.cell_size = max(float(cell_size), longest * self.MIN_CELL_FRACTION, 1e-9)
+
+        self.dims = (np.floor(extent / self.cell_size).astype(np.int64) + 1)
+
+        keys = self._keys(self._cells(self.points))
+        self.order = np.argsort(keys, kind='stable')
+        self.cell_keys, self.cell_starts, self.cell_counts = np.unique(keys[self.order],
+            return_index=True, return_counts=True)
+
+        return
+
+    def _cells(self, points):
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    def _keys(self, cells):
+        return (cells[..., 0] * self.dims[1] + cells[..., 1]) * self.dims[2] + cells[..., 2]
+
+    def _candidates(self, center, radius):
+        '''
+        Indices of every point in the cells a sphere overlaps.
+        '''
+
+        low = np.maximum(self._cells(center - radius), 0)
+        high = np.minimum(self._cells(center + radius), self.dims - 1)
+        if(np.any(high < low)):
+            return np.empty(0, dtype=np.int64)
+
+        # A sphere spanning more cells than hold points is cheaper to test against those.
+        if(np.prod(high - low + 1) > len(self.cell_keys)):
+            occupied = np.stack([self.cell_keys // (self.dims[1] * self.dims[2]),
+                (self.cell_keys // self.dims[2]) % self.dims[1], self.cell_keys % self.dims[2]], 
+                axis=-1)
+            keys = self.cell_keys[np.all((occupied >= low) & (occupied <= high), axis=1)]
+        else:
+            axes = [np.arange(low[axis], high[axis] + 1) for axis in range(3)]
+            block = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+            keys = self._keys(block)
+
+        # Only the cells that actually hold points.
+        slots = np.searchsorted(self.cell_keys, keys)
+        valid = (slots < len(self.cell_keys))
+        slots, keys = slots[valid], keys[valid]
+        slots = slots[self.cell_keys[slots] == keys]
+        if(len(slots) == 0):
+            return np.empty(0, dtype=np.int64)
+
+        ranges = [np.arange(start, start + count) for start, count in
+            zip(self.cell_starts[slots], self.cell_counts[slots])]
+
+        return self.order[np.concatenate(ranges)]
+
+    def query_radius(self, center, radius):
+        '''
+        Indices of all points within radius of center, nearest first.
+        '''
+
+        center = np.asarray(center, dtype=float)
+        candidates = self._candidates(center, radius)
+        dists = np.linalg.norm(self.points[candidates] - center, axis=-1)
+        inside = (dists <= radius)
+        found = candidates[inside]
+
+        return found[np.argsort(dists[inside], kind='stable')]
+
+    def query_pairs(self, centers, radius):
+        '''
+        Everything within radius of each of many centers.  Returns a list holding, per center,
+        the indices found (nearest first) and their distances.
+        '''
+
+        results = []
+
+        for center in np.asarray(centers, dtype=float).reshape(-1, 3):
+            found = self.query_radius(center, radius)
+            results.append((found, np.linalg.norm(self.points[found] - center, axis=-1)))
+
+        return results
@@ -0,0 +1,216 @@
+# splines.py
+# Created: Monday, 19th October 2026 5:06:52 pm
+# Matthew Riche
+# Last Modified: Monday, 19th October 2026 5:06:58 pm
+# Modified By: Matthew Riche
+
+'''
+B-spline interpolation and sampling in NumPy, for curves through many placers.
+
+A curve through N points is fitted at a fixed, low degree (cubic by default), never at degree N-1.
+Its parameters come from chord lengths (or their square roots, the centripetal kind), and its knots
+are averaged from them, which keeps the fit steady however unevenly the points are spaced.
+Curves come back as the same points/knots/degree dicts the control shape library uses, with Maya's
+knot count.
+
+Only the degree + 1 basis functions that are non-zero at a parameter are ever worked out, so
+evaluating a long curve costs the same per sample as a short one.  Joint chains along a curve can
+be given rotation-minimizing frames here too.  No Maya is needed.
+'''
+
+import numpy as np
+
+
+# Exponent on the chord lengths for each parameterization.
+PARAMETERIZATIONS = {'uniform':0.0, 'centripetal':0.5, 'chord':1.0}
+
+
+def curve_params(points, parameterization='chord'):
+    '''
+    A parameter in [0, 1] for every point, spaced by (chord length) ** exponent.
+    '''
+
+    points = np.asarray(points, dtype=float)
+    steps = np.linalg.norm(np.diff(points, axis=0), axis=1) ** PARAMETERIZATIONS[parameterization]
+    total = float(steps.sum())
+
+    # Coincident points have nothing to measure; fall back to even spacing.
+    if(total <= 0.0):
+        return np.linspace(0.0, 1.0, len(points))
+
+    params = np.concatenate([[0.0], np.cumsum(steps) / total])
+    params[-1] = 1.0
+
+    return params
+
+
+def averaged_knots(params, degree):
+    '''
+    The full, clamped knot vector for interpolating at params: each inner knot is the average of
+    degree consecutive params.
+    '''
+
+    count = len(params)
+    windows = np.cumsum(np.concatenate([[0.0], params]))
+    inner = (windows[degree + 1:count] - windows[1:count - degree]) / degree
+
+    return np.concatenate([np.zeros(degree + 1), inner, np.ones(degree + 1)])
+
+
+def find_spans(full_knots, degree, count, params):
+    '''
+    The knot span each param falls in, clamped to the curve's domain.
+    '''
+
+    spans = np.searchsorted(full_knots, params, side='right') - 1
+
+    return np.clip(spans, degree, count - 1)
+
+
+def basis_functions(full_knots, degree, spans, params):
+    '''
+    The degree + 1 non-zero basis functions at every param, as a (len(params), degree + 1) array.
+    Column k weights CV spans - degree + k.
+    '''
+
+    params = np.asarray(params, dtype=float)
+    basis = np.zeros((len(params), degree + 1))
+    basis[:, 0] = 1.0
+    left = np.zeros((len(params), degree + 1))
+    right = np.zeros((len(params), degree + 1))
+
+    for j in range(1, degree + 1):
+        left[:, j] = params - full_knots[spans + 1 - j]
+        right[:, j] = full_knots[spans + j] - params
+        saved = np.zeros(len(params))
+        for r in range(j):
+            temp = basis[:, r] / (right[:, r + 1] + left[:, j - r])
+            basis[:, r] = saved + right[:, r + 1] * temp
+            saved = left[:, j - r] * temp
+        basis[:, j] = saved
+
+    return basis
+
+
+def interpolate(points, degree=3, parameterization='chord'):
+    '''
+    A B-spline passing through every point, as a {'points', 'knots', 'degree'} dict with Maya's
+    knot count.  Repeated neighbouring points count once, and the degree drops to fit when there
+    are too few points for it.
+    '''
+
+    points = np.asarray(points, dtype=float)
+
+    # A point sitting on the one before it adds nothing and would make the system singular.
+    if(len(points) > 1):
+        scale = max(float(np.abs(points).max()), 1.0)
+        steps = np.linalg.norm(np.diff(points, axis=0), axis=1)
+        points = points[np.concatenate([[True], steps > 1e-9 * scale])]
+
+    count = len(points)
+    if(count < 2):
+        raise ValueError("A curve needs at least two distinct points; got {}.".format(count))
+
+    degree = max(1, min(int(degree), count - 1))
+    params = curve_params(points, parameterization)
+    full_knots = averaged_knots(params, degree)
+
+    # Each row of the system only touches degree + 1 CVs.
+    spans = find_spans(full_knots, degree, count, params)
+    system = np.zeros((count, count))
+    columns = (spans - degree)[:, None] + np.arange(degree + 1)[None, :]
+    np.put_along_axis(system, columns, basis_functions(full_knots, degree, spans, params), axis=1)
+
+    cvs = np.linalg.solve(system, points)
+
+    return {'points':cvs, 'knots':full_knots[1:-1], 'degree':degree}
+
+
+def evaluate(curve, params):
+    '''
+    Points on a curve dict at each param, as an (N, 3) array.
+    '''
+
+    cvs = np.asarray(curve['points'], dtype=float)
+    degree = curve['degree']
+    knots = np.asarray(curve['knots'], dtype=float)
+    full_knots = np.concatenate([knots[:1], knots, knots[-1:]])
+
+    params = np.asarray(params, dtype=float)
+    spans = find_spans(full_knots, degree, len(cvs), params)
+    basis = basis_functions(full_knots, degree, spans, params)
+    rows = (spans - degree)[:, None] + np.arange(degree + 1)[None, :]
+
+    return np.einsum('pk,pkc->pc', basis, cvs[rows])
+
+
+def sample_by_length(curve, count, per_span=16):
+    '''
+    count points spread evenly by arc length along a curve dict, ends included.
+    '''
+
+    knots = np.asarray(curve['knots'], dtype=float)
+    spans = max(1, len(curve['points']) - curve['degree'])
+    dense_params = np.linspace(knots[0], knots[-1], spans * per_span + 1)
+    dense = evaluate(curve, dense_params)
+
+    lengths = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(dense, axis=0), axis=1))])
+    wanted = np.linspace(0.0, lengths[-1], max(int(count), 2))
+
+    return evaluate(curve, np.interp(wanted, lengths, dense_params))
+
+
+def rotation_minimizing_frames(points, up=(0.0, 0.0, 1.0), aim_axis=0, up_axis=2):
+    '''
+    World matrices, (N, 4, 4), for a chain of joints at points: each aims down the chain at the
+    next, and the up axis is carried along by double reflection so it never twists or flips
+    more than the chain itself bends.  up sets the first joint's up direction; the last joint
+    keeps the orientation of the one before it.
+    '''
+
+    points = np.asarray(points, dtype=float)
+    count = len(points)
+
+    segments = np.diff(points, axis=0)
+    lengths = np.linalg.norm(segments, axis=1, keepdims=True)
+    tangents = segments / np.where(lengths == 0.0, 1.0, lengths)
+    tangents = np.vstack([tangents, tangents[-1:]])
+
+    # Start from up, made perpendicular to the first aim; any axis will do if they're parallel.
+    first_up = np.asarray(up, dtype=float) - (np.dot(up, tangents[0]) * tangents[0])
+    if(np.linalg.norm(first_up) < 1e-6):
+        fallback = np.eye(3)[np.argmin(np.abs(tangents[0]))]
+        first_up = fallback - (np.dot(fallback, tangents[0]) * tangents[0])
+
+    ups = np.empty((count, 3))
+    ups[0] = first_up / np.linalg.norm(first_up)
+
+    for i in range(count - 1):
+        ups[i + 1] = ups[i]
+        step = segments[i]
+        c1 = np.dot(step, step)
+        if(c1 < 1e-12):
+            continue
+
+        # Reflect across the plane between the two points, then across the one between tangents.
+        reflected_up = ups[i] - (2.0 / c1) * np.dot(step, ups[i]) * step
+        reflected_tangent = tangents[i] - (2.0 / c1) * np.dot(step, tangents[i]) * step
+        turn = tangents[i + 1] - reflected_tangent
+        c2 = np.dot(turn, turn)
+        if(c2 > 1e-12):
+            reflected_up = reflected_up - (2.0 / c2) * np.dot(turn, reflected_up) * turn
+        ups[i + 1] = reflected_up / np.linalg.norm(reflected_up)
+
+    # Rows are the axes; the remaining one completes a right-handed frame.
+    other = 3 - aim_axis - up_axis
+    rows = np.empty((count, 3, 3))
+    rows[:, aim_axis] = tangents
+    rows[:, up_axis] = ups
+    rows[:, other] = np.cross(rows[:, (other + 1) % 3], rows[:, (other + 2) % 3])
+
+    matrices = np.zeros((count, 4, 4))
+    matrices[:, :3, :3] = rows
+    matrices[:, 3, :3] = points
+    matrices[:, 3, 3] = 1.0
+
+    return matrices
@@ -0,0 +1,112 @@
+# style.py
+# Created: Tuesday, 20th October 2026 1:41:19 pm
+# Matthew Riche
+# Last Modified: Tuesday, 20th October 2026 1:41:24 pm
+# Modified By: Matthew Riche
+
+'''
+Rig-wide restyling: colour every control of a rig or module by side and role in one pass, without
+rebuilding anything.
+
+A scheme maps (side, role) pairs to colours: a colour_enum name, an index, or an (r, g, b) tuple.
+Sides are 'left', 'right' or None; roles come from each module's control_roles() ('main', 'ik',
+'switch', 'pole') or are None for plain nodes.  A None in a key matches anything, so a scheme can
+be as coarse or as fine as wanted.
+'''
+
+import maya.cmds as cmds
+import pymel.core as pm
+
+from . import colour as col
+from . import metadata as meta
+from . symmetry import side_of
+
+
+DEFAULT_SCHEME = {
+    ('left', 'main'):'red',
+    ('right', 'main'):'blue',
+    ('left', 'ik'):'red',
+    ('right', 'ik'):'blue',
+    ('left', 'switch'):'pale_orange',
+    ('right', 'switch'):'cyan',
+    (None, 'pole'):'yellow',
+    (None, None):'yellow'
+}
+
+
+def resolve(scheme, side, role):
+    '''
+    The colour a scheme gives a side and role, the most specific key first.  None if no key fits.
+    '''
+
+    for key in ((side, role), (side, None), (None, role), (None, None)):
+        if(key in scheme):
+            return scheme[key]
+
+    return None
+
+
+def _collect(targets):
+    '''
+    Map the long name of every control under targets to its (side, role).  Targets are modules,
+    which know their controls' roles, or nodes, whose curve-shaped descendants are all taken.
+    '''
+
+    styles = {}
+
+    for target in targets:
+        if(hasattr(target, 'control_roles')):
+            side = side_of(target.side_prefix)
+            # Each control is looked up on its own, so a deleted or ambiguous one can only skip
+            # itself, never shift roles onto its neighbours.
+            for control, role in target.control_roles().items():
+                names = (cmds.ls(str(control), long=True) if control is not None else None) or []
+                if(len(names) != 1):
+                    print("Skipping {} control {}; it can't be found in the scene.".format(
+                        target.name, control))
+                    continue
+                styles[names[0]] = (side or side_of(names[0]), role)
+        else:
+            shapes = cmds.ls(str(target), dag=True, type='nurbsCurve', long=True, ni=True) or []
+            for shape in shapes:
+                transform = shape.rsplit('|', 1)[0]
+                styles.setdefault(transform, (side_of(transform), None))
+
+    return styles
+
+
+def restyle(targets=None, scheme=None):
+    '''
+    Colour every control shape under targets (modules and/or nodes) by scheme, as one undoable
+    step.  Without targets, every module recorded on the rig root is restyled.
+    Returns the number of shapes coloured.
+    '''
+
+    if(targets is None):
+        targets = list(meta.load_modules().values())
+    if(scheme is None):
+        scheme = DEFAULT_SCHEME
+
+    styles = _collect(targets)
+    if(len(styles) == 0):
+        return 0
+
+    # Group every shape by its colour, so each colour is applied in one go.
+    by_colour = {}
+    for shape in (cmds.listRelatives(list(styles), shapes=True, fullPath=True, ni=True) or []):
+        colour = resolve(scheme, *styles[shape.rsplit('|', 1)[0]])
+        if(colour is not None):
+            key = (tuple(colour) if isinstance(colour, (list, tuple)) else colour)
+            by_colour.setdefault(key, []).append(shape)
+
+    pm.undoInfo(openChunk=True)
+    try:
+        for colour, shapes in by_colour.items():
+            col.set_override(shapes, colour)
+    finally:
+        pm.undoInfo(closeChunk=True)
+
+    count = sum(len(shapes) for shapes in by_colour.values())
+    print("Restyled {} shapes on {} controls.".format(count, len(styles)))
+
+    return count
@@ -0,0 +1,211 @@
+# symmetry.py
+# Created: Monday, 19th October 2026 4:12:37 pm
+# Matthew Riche
+# Last Modified: Monday, 19th October 2026 4:12:42 pm
+# Modified By: Matthew Riche
+
+'''
+Finds left/right counterparts in an existing scene by where nodes actually are, not only by what
+they are called.
+
+Every candidate's world position is read in one pass through the API and indexed in a spatial
+grid (spatial.py).  Each node on the positive side of the mirror plane is reflected and looked up
+within a tolerance.  Where several nodes share a spot (a joint, its control and its null), the
+same node type and then the counterpart name break the tie.  What can't be settled is reported,
+not guessed.  The pairs found can then drive placer mirroring and side colouring.
+'''
+
+import numpy as np
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import pymel.core as pm
+
+from . spatial import GridIndex
+from . import placer as plc
+from . import colour as col
+
+
+# Side tokens swapped when guessing a counterpart's name; prefixes first, then suffixes.
+SIDE_PREFIXES = (('L_', 'R_'), ('l_', 'r_'), ('Lf_', 'Rt_'), ('left_', 'right_'))
+SIDE_SUFFIXES = (('_L', '_R'), ('_l', '_r'), ('_Lf', '_Rt'), ('_left', '_right'))
+
+
+def short_name(node):
+    return str(node).split('|')[-1].split(':')[-1]
+
+
+def counterpart_name(name):
+    '''
+    The name a node's mirror ought to have, by swapping its side token, e.g. L_arm_wrist becomes
+    R_arm_wrist.  Returns None for names that carry no side.
+    '''
+
+    name = short_name(name)
+
+    for left, right in SIDE_PREFIXES:
+        if(name.startswith(left)):
+            return right + name[len(left):]
+        if(name.startswith(right)):
+            return left + name[len(right):]
+
+    for left, right in SIDE_SUFFIXES:
+        if(name.endswith(left)):
+            return name[:-len(left)] + right
+        if(name.endswith(right)):
+            return name[:-len(right)] + left
+
+    return None
+
+
+def side_of(name):
+    '''
+    'left' or 'right' by a name's side token, or None for names that carry no side.
+    '''
+
+    name = short_name(name)
+
+    for left, right in SIDE_PREFIXES:
+        if(name.startswith(left)):
+            return 'left'
+        if(name.startswith(right)):
+            return 'right'
+
+    for left, right in SIDE_SUFFIXES:
+        if(name.endswith(left)):
+            return 'left'
+        if(name.endswith(right)):
+            return 'right'
+
+    return None
+
+
+def world_positions(nodes):
+    '''
+    World-space pivots of many DAG nodes, as an (N, 3) array, in one API pass.
+    '''
+
+    selection = om.MSelectionList()
+    for node in nodes:
+        selection.add(str(node))
+
+    points = np.empty((len(nodes), 3))
+    for i in range(len(nodes)):
+        matrix = selection.getDagPath(i).inclusiveMatrix()
+        points[i] = (matrix[12], matrix[13], matrix[14])
+
+    return points
+
+
+def find_symmetry(nodes=None, mirror_axis='x', tolerance=0.01, types=('joint', 'transform')):
+    '''
+    Pair nodes across the mirror plane of mirror_axis.  Without nodes, every node of the given
+    types in the scene is a candidate.
+
+    Returns a report dict:
+        'pairs'           [(positive side node, negative side node), ...]
+        'centre'          nodes lying on the mirror plane
+        'unmatched'       nodes with nothing at their reflected position
+        'ambiguous'       {node:[candidates]} where position, type and name couldn't settle it
+        'name_mismatches' pairs whose names don't swap sides into each other
+    '''
+
+    # One query for names and types together.
+    if(nodes is None):
+        listing = cmds.ls(type=list(types), long=True, showType=True) or []
+    else:
+        listing = cmds.ls([str(node) for node in nodes], long=True, showType=True) or []
+    nodes = listing[0::2]
+    node_types = listing[1::2]
+
+    report = {'pairs':[], 'centre':[], 'unmatched':[], 'ambiguous':{}, 'name_mismatches':[]}
+    if(len(nodes) == 0):
+        return report
+
+    axis = 'xyz'.index(mirror_axis.lower())
+    points = world_positions(nodes)
+    side = points[:, axis]
+
+    reflected = points.copy()
+    reflected[:, axis] *= -1.0
+
+    index = GridIndex(points)
+    positive = np.flatnonzero(side > tolerance)
+    short_names = [short_name(node) for node in nodes]
+
+    claims = {} # negative side node index: positive side node indices that picked it.
+
+    for i, (found, dists) in zip(positive, index.query_pairs(reflected[positive], tolerance)):
+        found = [j for j in found if side[j] < -tolerance]
+
+        # Narrow shared spots down by type, then by name; each only if it leaves something.
+        for keep in (lambda j: node_types[j] == node_types[i],
+            lambda j: short_names[j] == counterpart_name(short_names[i])):
+            if(len(found) > 1):
+                narrowed = [j for j in found if keep(j)]
+                if(narrowed):
+                    found = narrowed
+
+        if(len(found) == 0):
+            report['unmatched'].append(nodes[i])
+        elif(len(found) > 1):
+            report['ambiguous'][nodes[i]] = [nodes[j] for j in found]
+        else:
+            claims.setdefault(found[0], []).append(i)
+
+    for j, claimants in claims.items():
+        if(len(claimants) > 1):
+            for i in claimants:
+                report['ambiguous'][nodes[i]] = [nodes[j]]
+            continue
+
+        i = claimants[0]
+        report['pairs'].append((nodes[i], nodes[j]))
+        if(counterpart_name(short_names[i]) != short_names[j]):
+            report['name_mismatches'].append((nodes[i], nodes[j]))
+
+    # Negative side nodes that nothing claimed, and everything on the plane.
+    claimed = set(claims)
+    for j in np.flatnonzero(side < -tolerance):
+        if(j not in claimed):
+            report['unmatched'].append(nodes[j])
+    report['centre'] = [nodes[k] for k in np.flatnonzero(np.abs(side) <= tolerance)]
+
+    print("Symmetry: {} pairs, {} centred, {} unmatched, {} ambiguous, {} name mismatches.".format(
+        len(report['pairs']), len(report['centre']), len(report['unmatched']),
+        len(report['ambiguous']), len(report['name_mismatches'])))
+
+    return report
+
+
+def mirror_placers(report, mirror_axis='x', suffix='_plc'):
+    '''
+    Connect every matched pair of placers in a report so the negative side follows the positive.
+    '''
+
+    count = 0
+
+    for live, matched in report['pairs']:
+        if(short_name(live).endswith(suffix) and short_name(matched).endswith(suffix)):
+            plc.mirror_placer(pm.PyNode(live), pm.PyNode(matched), mirror_axis=mirror_axis)
+            count += 1
+
+    print("Mirrored {} placer pairs.".format(count))
+
+    return count
+
+
+def colour_sides(report, positive='red', negative='blue', centre='yellow'):
+    '''
+    Colour the curve controls in a report by side: the positive side, the negative side, and
+    anything on the mirror plane.
+    '''
+
+    sides = ((positive, [pair[0] for pair in report['pairs']]),
+        (negative, [pair[1] for pair in report['pairs']]), (centre, report['centre']))
+
+    for colour, nodes in sides:
+        shapes = (cmds.listRelatives(nodes, shapes=True, type='nurbsCurve', fullPath=True) 
+            if nodes else None)
+        col.set_override(shapes or [], colour)
+
+    return